@@ -0,0 +1,10 @@
+"""
+Benchmarks
+
+These are timing checks for the game's hot paths, rather than correctness tests.
+They are named `bench_*.py` so that they aren't picked up by the normal test run;
+to run them, use:
+
+    evennia test --settings settings.py --pattern "bench_*.py" benchmarks
+
+"""
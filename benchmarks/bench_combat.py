@@ -0,0 +1,74 @@
+"""
+Benchmarks for combat victory checks
+
+Compares checking for victory by looking up every fighter's status tags against the
+CombatScript's in-memory defeated set, while one side of a 50-vs-50 fight is knocked out.
+"""
+
+from timeit import default_timer
+from evennia.utils import create
+from evennia.utils.test_resources import EvenniaTest
+
+from typeclasses.scripts import get_or_create_combat_script
+
+_TEAM_SIZE = 50
+_STATUSES = ["unconscious", "dead", "defeated"]
+
+
+def _tag_check_victory(teams):
+    """The old way: look up each fighter's status tags, then scan each team list."""
+    active = [
+        obj
+        for obj in teams[0] + teams[1]
+        if not any(obj.tags.has(_STATUSES, category="status"))
+    ]
+    team_a, team_b = [[obj for obj in team if obj in active] for team in teams]
+    return not (team_a and team_b)
+
+
+class BenchCombatVictory(EvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.team_a = [
+            create.object(key=f"a{i}", location=self.room1) for i in range(_TEAM_SIZE)
+        ]
+        self.team_b = [
+            create.object(key=f"b{i}", location=self.room1) for i in range(_TEAM_SIZE)
+        ]
+
+    def test_50v50_knockouts(self):
+        # both ways tag each knocked-out fighter, same as the real knockout code does
+        # the old way, with a full victory check after every knockout
+        teams = [list(self.team_a), list(self.team_b)]
+        start = default_timer()
+        for obj in self.team_b:
+            obj.tags.add("unconscious", category="status")
+            over = _tag_check_victory(teams)
+        tag_time = default_timer() - start
+        self.assertTrue(over)
+        for obj in self.team_b:
+            obj.tags.remove("unconscious", category="status")
+
+        # the new way, through the combat script
+        combat = get_or_create_combat_script(self.room1)
+        combat.add_combatant(self.team_a[0], enemy=self.team_b[0])
+        for obj in self.team_a[1:]:
+            combat.add_combatant(obj, ally=self.team_a[0])
+        for obj in self.team_b[1:]:
+            combat.add_combatant(obj, enemy=self.team_a[0])
+        self.assertEqual(len(combat.fighters), _TEAM_SIZE * 2)
+        start = default_timer()
+        for obj in self.team_b:
+            obj.tags.add("unconscious", category="status")
+            combat.set_defeated(obj)
+            combat.check_victory()
+        set_time = default_timer() - start
+        self.assertFalse(combat.pk)
+
+        print(f"\n{_TEAM_SIZE}v{_TEAM_SIZE} fight, {_TEAM_SIZE} knockouts")
+        print(
+            f"  status tag checks:  {tag_time / _TEAM_SIZE * 1e6:10.2f} us per knockout"
+        )
+        print(
+            f"  defeated set:       {set_time / _TEAM_SIZE * 1e6:10.2f} us per knockout"
+        )
@@ -0,0 +1,99 @@
+"""
+Benchmarks for spawning crafted outputs
+
+Compares the per-craft cost of spawning a meat pie recipe's six slices from its inline
+prototype dicts against spawning them from the recipe's compiled outputs.
+"""
+
+from itertools import groupby
+from timeit import default_timer
+from evennia.utils.test_resources import EvenniaTest
+
+from evennia.prototypes import prototypes as protlib
+from evennia.prototypes.spawner import spawn
+
+from world.recipes.cooking import MeatPieRecipe
+from world.spawning import bulk_spawn
+
+_CRAFTS = 50
+
+
+def _inline_spawn(recipe, crafter):
+    """The old way: hand the prototype dicts to the spawner on every craft."""
+    requests = []
+    for _, group in groupby(recipe.output_prototypes, key=id):
+        group = list(group)
+        requests.append((group[0], len(group), crafter))
+    return bulk_spawn(*requests).objects
+
+
+def _inline_params(recipe):
+    """Just the prototype handling of the old way, without creating anything."""
+    params = []
+    for _, group in groupby(recipe.output_prototypes, key=id):
+        group = list(group)
+        prototype = protlib.homogenize_prototype(group[0])
+        params.extend(spawn(*[prototype] * len(group), only_validate=True))
+    return params
+
+
+def _compiled_params(recipe):
+    """Just the prototype handling of the new way, without creating anything."""
+    params = []
+    for compiled, amount in recipe.compiled_outputs:
+        params.extend(compiled.build(amount))
+    return params
+
+
+def _compiled_spawn(recipe, crafter):
+    """The new way: reuse the prototypes the recipe compiled."""
+    requests = [
+        (compiled, amount, crafter) for compiled, amount in recipe.compiled_outputs
+    ]
+    return bulk_spawn(*requests).objects
+
+
+class BenchCraftingOutputs(EvenniaTest):
+    def test_per_craft_cost(self):
+        # warm up the compiled prototypes, same as the first craft of a recipe does
+        _compiled_spawn(MeatPieRecipe, self.char1)
+
+        start = default_timer()
+        inline = [_inline_spawn(MeatPieRecipe, self.char1) for _ in range(_CRAFTS)]
+        inline_time = default_timer() - start
+
+        start = default_timer()
+        compiled = [_compiled_spawn(MeatPieRecipe, self.char1) for _ in range(_CRAFTS)]
+        compiled_time = default_timer() - start
+
+        start = default_timer()
+        for _ in range(_CRAFTS):
+            _inline_params(MeatPieRecipe)
+        inline_params_time = default_timer() - start
+
+        start = default_timer()
+        for _ in range(_CRAFTS):
+            _compiled_params(MeatPieRecipe)
+        compiled_params_time = default_timer() - start
+
+        # both ways must make the same things
+        for old, new in zip(inline[0], compiled[0]):
+            self.assertEqual(old.key, new.key)
+            self.assertEqual(old.typeclass_path, new.typeclass_path)
+            self.assertEqual(old.tags.has("edible"), new.tags.has("edible"))
+            self.assertEqual(old.db.energy, new.db.energy)
+        self.assertEqual(sum(map(len, inline)), sum(map(len, compiled)))
+
+        print(f"\nmeat pie, {_CRAFTS} crafts")
+        print(
+            f"  inline prototypes per craft:   {inline_time / _CRAFTS * 1000:8.2f} ms"
+        )
+        print(
+            f"  compiled prototypes per craft: {compiled_time / _CRAFTS * 1000:8.2f} ms"
+        )
+        print(
+            f"  inline prototype handling:     {inline_params_time / _CRAFTS * 1e6:8.2f} us"
+        )
+        print(
+            f"  compiled prototype handling:   {compiled_params_time / _CRAFTS * 1e6:8.2f} us"
+        )
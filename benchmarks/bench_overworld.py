@@ -0,0 +1,73 @@
+"""
+Benchmarks for overworld map lookups
+
+Compares the per-move cost of re-splitting the map string against the pre-parsed
+TerrainGrid, on a generated 1000x1000 map.
+"""
+
+from random import choice, randint, seed
+from timeit import timeit
+from unittest import TestCase
+
+from world.maps import overworld
+
+_MAP_SIZE = 1000
+_MOVES = 200
+
+
+def _generate_map(size):
+    """Generate a random square map string out of the overworld's map symbols."""
+    symbols = list(overworld.MAP_KEY.keys()) + ["~"]
+    rows = ["".join(choice(symbols) for _ in range(size)) for _ in range(size)]
+    return "\n" + "\n".join(rows) + "\n"
+
+
+def _split_move(map_str, coordinates):
+    """The old way: re-split the map string for every lookup, three times per move."""
+    x, y = coordinates
+    for _ in range(3):
+        rows = map_str.split("\n")
+        rows.reverse()
+        tile = rows[y][x]
+    return overworld.MAP_KEY.get(tile)
+
+
+def _grid_move(grid, coordinates):
+    """The new way: look up the pre-parsed tile, three times per move."""
+    for _ in range(3):
+        tile = grid.get_tile(coordinates)
+    return tile
+
+
+class BenchTerrainGrid(TestCase):
+    def test_per_move_cost(self):
+        seed(0)
+        map_str = _generate_map(_MAP_SIZE)
+        build_time = timeit(
+            lambda: overworld.TerrainGrid(map_str, overworld.MAP_KEY), number=1
+        )
+        grid = overworld.TerrainGrid(map_str, overworld.MAP_KEY)
+        moves = [
+            (randint(2, _MAP_SIZE - 3), randint(2, _MAP_SIZE - 3))
+            for _ in range(_MOVES)
+        ]
+
+        split_time = timeit(
+            lambda: [_split_move(map_str, coords) for coords in moves], number=1
+        )
+        grid_time = timeit(
+            lambda: [_grid_move(grid, coords) for coords in moves], number=1
+        )
+        minimap_time = timeit(
+            lambda: [grid.get_rows(coords, 2) for coords in moves], number=1
+        )
+
+        # the two approaches must agree on every tile
+        for coords in moves:
+            self.assertIs(_split_move(map_str, coords), _grid_move(grid, coords))
+
+        print(f"\n{_MAP_SIZE}x{_MAP_SIZE} map, {_MOVES} moves")
+        print(f"  grid build (once):  {build_time * 1000:10.2f} ms")
+        print(f"  split per move:     {split_time / _MOVES * 1e6:10.2f} us")
+        print(f"  grid per move:      {grid_time / _MOVES * 1e6:10.2f} us")
+        print(f"  5x5 minimap rows:   {minimap_time / _MOVES * 1e6:10.2f} us")
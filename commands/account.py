@@ -20,10 +20,7 @@ class CmdSettings(MuxCommand):
 
     def func(self):
         caller = self.caller
-
-        if not (settings := caller.db.settings):
-            caller.msg("You have no settings to change.")
-            return
+        settings = caller.game_settings
 
         if not self.args:
             rows = []
@@ -39,10 +36,10 @@ class CmdSettings(MuxCommand):
             self.msg(f"{self.lhs} is {'|GON|n' if value else '|ROFF|n'}")
         else:
             if self.rhs.lower() == "on":
-                caller.db.settings[self.lhs] = True
+                settings.set(self.lhs, True)
                 self.msg(f"{self.lhs} has been set |GON|n")
             elif self.rhs.lower() == "off":
-                caller.db.settings[self.lhs] = False
+                settings.set(self.lhs, False)
                 self.msg(f"{self.lhs} has been set |ROFF|n")
             else:
                 self.msg(f"Invalid value {self.rhs} for {self.lhs}.")
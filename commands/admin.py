@@ -0,0 +1,40 @@
+"""
+Admin commands for managing the game world.
+"""
+
+from evennia.utils import iter_to_str
+
+from world.maps import overworld
+from .command import Command
+
+
+class CmdSeedOverworld(Command):
+    """
+    Fill the overworld up to its resource and mob caps.
+
+    Usage:
+        seedworld
+
+    Spawns resource nodes and dormant mobs across every overworld biome, so that
+    a fresh world doesn't start out empty. Biomes which are already at their caps
+    are left alone.
+    """
+
+    key = "seedworld"
+    locks = "cmd:perm(Developer)"
+    help_category = "admin"
+
+    def func(self):
+        self.msg("Seeding the overworld...")
+        seeded = overworld.seed()
+        if not seeded:
+            self.msg("Every biome is already at its caps.")
+            return
+        self.msg(
+            "Seeded "
+            + iter_to_str(
+                f"{count} {category.replace('_', ' ')}s in the {biome}"
+                for (biome, category), count in sorted(seeded.items())
+            )
+            + "."
+        )
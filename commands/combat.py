@@ -95,20 +95,17 @@ class CmdAttack(Command):
         self.caller.attack(target, weapon)
 
         # check if we have auto-attack in settings
-        if self.account and (settings := self.account.db.settings):
-            if settings.get("auto attack"):
-                # let the player know we'll be auto-attacking
-                self.msg(f"[ Auto-attack is ON ]")
+        if (settings := self.caller.account_settings) and settings.auto_attack:
+            # let the player know we'll be auto-attacking
+            self.msg(f"[ Auto-attack is ON ]")
 
     def at_post_cmd(self):
         """
         optional post-command auto prompt
         """
         # check if we have auto-prompt in settings
-        if self.account and (settings := self.account.db.settings):
-            if settings.get("auto prompt"):
-                status = self.caller.get_display_status(self.caller)
-                self.msg(prompt=status)
+        if (settings := self.caller.account_settings) and settings.auto_prompt:
+            self.caller.update_prompt()
 
 
 class CmdWield(Command):
@@ -239,8 +236,7 @@ class CmdFlee(Command):
             self.msg("There is nowhere to flee to!")
             return
 
-        if combat_script := caller.location.scripts.get("combat"):
-            combat_script = combat_script[0]
+        if combat_script := caller.combat:
             if not combat_script.remove_combatant(self.caller):
                 self.msg("You cannot leave combat.")
 
@@ -254,10 +250,8 @@ class CmdFlee(Command):
         optional post-command auto prompt
         """
         # check if we have auto-prompt in settings
-        if self.account and (settings := self.account.db.settings):
-            if settings.get("auto prompt"):
-                status = self.caller.get_display_status(self.caller)
-                self.msg(prompt=status)
+        if (settings := self.caller.account_settings) and settings.auto_prompt:
+            self.caller.update_prompt()
 
 
 class CmdRespawn(Command):
@@ -315,9 +309,7 @@ class CmdStatus(Command):
 
     def func(self):
         if not self.args:
-            target = self.caller
-            status = target.get_display_status(self.caller)
-            self.msg(prompt=status)
+            self.caller.update_prompt(force=True)
         else:
             target = self.caller.search(self.args.strip())
             if not target:
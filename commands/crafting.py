@@ -0,0 +1,125 @@
+"""
+Crafting commands
+"""
+
+from evennia.contrib.game_systems.crafting.crafting import craft
+from evennia.contrib.game_systems.crafting.crafting import CmdCraft as ContribCmdCraft
+from evennia.utils import inherits_from, iter_to_str
+
+from world.recipes.base import MAX_BATCH
+from world.recipes.index import RECIPE_INDEX
+
+
+class CmdCraft(ContribCmdCraft):
+    """
+    Craft an item using ingredients and tools
+
+    Usage:
+      craft [<number>] <recipe> [from <ingredient>,...] [using <tool>, ...]
+      craftable
+
+    Examples:
+      craft snowball from snow
+      craft 10 iron ingot from iron ore using furnace
+      craft puppet from piece of wood using knife
+      craft bread from flour, butter, water, yeast using owen, bowl, roller
+      craft fireball using wand, spellbook
+
+    Use |wcraftable|n, or |wcraft|n on its own, to see what you can make with
+    what you have right now.
+
+    Notes:
+        Ingredients must be in the crafter's inventory. Tools can also be
+        things in the current location, like a furnace, windmill or anvil.
+        When crafting several at once, the ingredients must be enough for
+        all of them.
+    """
+
+    aliases = ("craftable",)
+
+    def parse(self):
+        super().parse()
+        self.count = 1
+        count, _, recipe = self.recipe.partition(" ")
+        if count.isdigit() and recipe:
+            self.recipe = recipe.strip()
+            # anything over the limit gets rejected, so don't bother converting all of it
+            if len(count) > len(str(MAX_BATCH)):
+                self.count = MAX_BATCH + 1
+            else:
+                self.count = int(count)
+
+    def func(self):
+        if self.cmdstring == "craftable" or not self.args:
+            self.list_craftable()
+            return
+
+        if not self.recipe:
+            self.msg(
+                "Usage: craft [<number>] <recipe> from <ingredient>, ... [using <tool>,...]"
+            )
+            return
+        if self.count < 1:
+            self.msg("You can't craft fewer than one of something.")
+            return
+        if self.count > MAX_BATCH:
+            self.msg(f"You can't craft more than {MAX_BATCH} at once.")
+            return
+
+        if self.count == 1:
+            # a single craft is just the contrib command
+            super().func()
+            return
+
+        if (inputs := self.find_inputs()) is None:
+            return
+        # the recipe handles all of the messaging
+        craft(self.caller, self.recipe, *inputs, count=self.count)
+
+    def find_inputs(self):
+        """
+        Find the tools and ingredients for the craft, checking they can be used the same
+        way the contrib command does.
+
+        Returns:
+            list or None: The tools and then the ingredients, or None if any of them
+                couldn't be found or used.
+        """
+        caller = self.caller
+        inputs = []
+        # tools aren't used up, so they can also be in the room
+        for keys, location, err_attr in (
+            (self.tools, None, "crafting_tool_err_msg"),
+            (self.ingredients, caller, "crafting_consumable_err_msg"),
+        ):
+            for key in keys:
+                if not key:
+                    continue
+                if not (obj := caller.search(key, location=location)):
+                    return None
+                usable = obj.access(caller, "craft", default=True)
+                if location and (
+                    not inherits_from(obj, "evennia.objects.models.ObjectDB")
+                    or obj.sessions.all()
+                ):
+                    # don't use up characters or anything else that isn't an object
+                    usable = False
+                if not usable:
+                    self.msg(
+                        obj.attributes.get(
+                            err_attr,
+                            default=f"{obj.get_display_name(looker=caller)} can't be used for this.",
+                        )
+                    )
+                    return None
+                inputs.append(obj)
+        return inputs
+
+    def list_craftable(self):
+        """
+        Show every recipe the caller has the tools, materials and skill for.
+        """
+        if names := RECIPE_INDEX.craftable(self.caller):
+            self.msg(f"You can craft: {iter_to_str(names)}")
+        else:
+            self.msg("You don't have what you need to craft anything right now.")
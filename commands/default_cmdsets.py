@@ -20,13 +20,14 @@ from evennia.contrib.game_systems.clothing import ClothedCharacterCmdSet
 from evennia.contrib.game_systems.containers.containers import ContainerCmdSet
 from evennia.contrib.grid.xyzgrid.commands import XYZGridCmdSet
 from evennia.contrib.rpg.character_creator.character_creator import ContribCmdCharCreate
-from evennia.contrib.game_systems.crafting.crafting import CmdCraft
 
 
 from commands.combat import CombatCmdSet
+from commands.crafting import CmdCraft
 from commands.skills import SkillCmdSet
 from commands.interact import InteractCmdSet
 from commands.account import AccountOptsCmdSet
+from commands.admin import CmdSeedOverworld
 from commands.shops import CmdMoney
 
 
@@ -77,6 +78,7 @@ class AccountCmdSet(default_cmds.AccountCmdSet):
         #
         self.add(ContribCmdCharCreate)
         self.add(AccountOptsCmdSet)
+        self.add(CmdSeedOverworld)
 
 
 class UnloggedinCmdSet(default_cmds.UnloggedinCmdSet):
@@ -1,6 +1,6 @@
 from .command import Command
 from evennia import CmdSet
-from evennia.utils import make_iter
+from evennia.utils import inherits_from
 
 
 class CmdGather(Command):
@@ -46,22 +46,30 @@ class CmdEat(Command):
     aliases = ("drink", "consume")
 
     def func(self):
-        obj = self.caller.search(self.args.strip(), stacked=1)
+        # only search through edible things
+        candidates = [
+            obj
+            for obj in self.caller.contents + self.caller.location.contents
+            if obj.tags.has("edible")
+        ]
+        obj = self.caller.search(
+            self.args.strip(),
+            candidates=candidates,
+            nofound_string="You cannot eat that.",
+        )
         if not obj:
             return
-        # stacked sometimes returns a list, so make sure it is one for consistent handling
-        obj = make_iter(obj)[0]
-
-        if not obj.tags.has("edible"):
-            self.msg("You cannot eat that.")
-            return
 
         energy = obj.attributes.get("energy", 0)
         self.caller.traits.ep.current += energy
         self.caller.at_emote(
             f"$conj({self.cmdstring}) the {{target}}.", mapping={"target": obj}
         )
-        obj.delete()
+        # only eat one of a stack
+        if inherits_from(obj, "typeclasses.objects.StackableObject"):
+            obj.consume(1)
+        else:
+            obj.delete()
 
 
 class InteractCmdSet(CmdSet):
@@ -1,11 +1,65 @@
-from collections import Counter
 from evennia import CmdSet
+from evennia.objects.objects import DefaultObject
 from evennia.utils import iter_to_str, make_iter
-from evennia.utils.evtable import EvTable
 
+from typeclasses.objects import StackableObject
 from .command import Command
 
 
+def _quantity(obj):
+    """
+    How many items an object counts as - more than one, if it's a stack
+    """
+    return obj.quantity if isinstance(obj, StackableObject) else 1
+
+
+def _stock_name(obj, count, looker):
+    """
+    The name for some number of an item in stock, however many its stack happens to hold
+    """
+    if isinstance(obj, StackableObject):
+        # stacks count their own quantity, but this is for the amount being bought
+        return DefaultObject.get_numbered_name(obj, count, looker)[1]
+    return obj.get_numbered_name(count, looker)[1]
+
+
+def _split(objs):
+    """
+    Split off just the requested items from any stacks found by a stacked search
+    """
+    return [
+        obj.take_requested() if isinstance(obj, StackableObject) else obj
+        for obj in objs
+    ]
+
+
+def _reserve(objs, reserved=True):
+    """
+    Set aside - or release - stacks that are waiting on a transaction to be confirmed, so
+    that they don't merge with anything in the meantime
+    """
+    for obj in objs:
+        if isinstance(obj, StackableObject):
+            obj.ndb.reserved = reserved or None
+
+
+def _restack(objs):
+    """
+    Merge any stacks that were split off for a cancelled transaction back where they came from
+    """
+    for obj in objs:
+        if isinstance(obj, StackableObject):
+            obj.restack()
+
+
+def _release(objs):
+    """
+    Put back stacks set aside for a transaction which was never confirmed either way
+    """
+    _reserve(objs, False)
+    _restack(objs)
+
+
 class CmdList(Command):
     """
     View a list of items available for sale.
@@ -17,30 +71,17 @@ class CmdList(Command):
 
     def func(self):
         # verify that this shop has a storage box
-        if not (storage := self.obj.db.storage):
+        if not self.obj.db.storage:
             self.msg("This shop is not open for business.")
             return
 
-        listings = []
-        for obj in storage.contents:
-            # check if the object has a price set
-            if price := obj.db.price:
-                # add it and its price to the listings
-                listings.append((obj.name, price))
-
-        condensed = Counter(listings)
-        listings = [[key[0], val, key[1]] for key, val in condensed.items()]
-        if not condensed:
+        # the shop keeps its sale listings ready to go
+        if not (listing := self.obj.get_listing()):
             self.msg("This shop has nothing for sale right now.")
             return
 
-        # build a table from the sale listings
-        table = EvTable("Item", "Amt", "Price", border="rows")
-        for key, val in condensed.items():
-            table.add_row(key[0], val, key[1])
-
         # send it to the player
-        self.msg(str(table))
+        self.msg(listing)
 
 
 class CmdBuy(Command):
@@ -82,7 +123,7 @@ class CmdBuy(Command):
 
     def func(self):
         # verify that this shop has a storage box
-        if not (storage := self.obj.db.storage):
+        if not self.obj.db.storage:
             self.msg("This shop is not open for business.")
             return
 
@@ -91,25 +132,23 @@ class CmdBuy(Command):
             self.msg("You don't have any money!")
             return
 
-        # we want a stack of the item, matching the parsed count
-        objs = self.caller.search(self.args, location=storage, stacked=self.count)
-        if not objs:
-            # we found nothing, or it was too vague of a search
+        # look the item up in the shop's catalogue
+        keys = self.obj.find_stock(self.args)
+        if not keys:
+            self.msg(f"There are no {self.args} for sale.")
+            return
+        if len(keys) > 1:
+            self.msg(
+                f"Which do you mean: {iter_to_str([key[1] for key in keys], endsep='or')}?"
+            )
             return
 
-        # make the result into a list so we can handle it consistently
-        objs = make_iter(objs)
-        objs = [obj for obj in objs if obj.db.price]
-        if not objs:
-            # avoid this! don't put objects without price tags into the storage box!
+        # price as many as we can of what was asked for, straight from the catalogue
+        if not (quote := self.obj.quote_stock(keys[0], self.count)):
             self.msg(f"There are no {self.args} for sale.")
             return
-
-        example = objs[0]
-        count = len(objs)
-        obj_name = example.get_numbered_name(count, self.caller)[1]
-        # calculate the total for all the objects
-        total = sum([obj.attributes.get("price", 0) for obj in objs])
+        example, count, total = quote
+        obj_name = _stock_name(example, count, self.caller)
 
         # do we have enough money?
         if coins < total:
@@ -126,9 +165,24 @@ class CmdBuy(Command):
             self.msg("Purchase cancelled.")
             return
 
+        # nothing leaves the shop until now, so check it's all still there to be had
+        objs = self.obj.take_stock(keys[0], count)
+        price = sum([obj.attributes.get("price", 0) * _quantity(obj) for obj in objs])
+        if sum(_quantity(obj) for obj in objs) < count or price != total:
+            self.msg(f"The shop no longer has {obj_name} for {total} coins.")
+            for obj in objs:
+                self.obj.add_stock(obj)
+            return
+        if (self.caller.db.coins or 0) < total:
+            self.msg(f"You need {total} coins to buy that.")
+            for obj in objs:
+                self.obj.add_stock(obj)
+            return
+
         # everything is good! do a capitalism!
         for obj in objs:
             obj.location = self.caller
+        _restack(objs)
 
         self.caller.db.coins -= total
 
@@ -186,21 +240,30 @@ class CmdSell(Command):
             return
 
         # make the result into a list so we can handle it consistently
-        objs = make_iter(objs)
+        objs = _split(make_iter(objs))
         example = objs[0]
-        count = len(objs)
-        obj_name = example.get_numbered_name(count, self.caller)[1]
+        obj_name = _stock_name(
+            example, sum(_quantity(obj) for obj in objs), self.caller
+        )
         # calculate the total for all the objects
-        total = sum([obj.attributes.get("value", 0) for obj in objs])
+        total = sum([obj.attributes.get("value", 0) * _quantity(obj) for obj in objs])
 
         # confirm that this is what the player wants to buy
-        confirm = yield (
-            f"Do you want to sell {obj_name} for {total} coin{'' if total == 1 else 's'}? Yes/No"
-        )
+        _reserve(objs)
+        try:
+            confirm = yield (
+                f"Do you want to sell {obj_name} for {total} coin{'' if total == 1 else 's'}? Yes/No"
+            )
+        except GeneratorExit:
+            # the question was abandoned, e.g. by logging out, so put everything back
+            _release(objs)
+            raise
+        _reserve(objs, False)
 
         # if it's not a form of yes, cancel
         if confirm.lower().strip() not in ("yes", "y"):
             self.msg("Sale cancelled.")
+            _restack(objs)
             return
 
         # everything is good! do a capitalism!
@@ -277,21 +340,32 @@ class CmdDonate(Command):
             return
 
         # make the result into a list so we can handle it consistently
-        objs = make_iter(objs)
+        objs = _split(make_iter(objs))
         example = objs[0]
-        count = len(objs)
-        obj_name = example.get_numbered_name(count, self.caller)[1]
+        obj_name = _stock_name(
+            example, sum(_quantity(obj) for obj in objs), self.caller
+        )
         # calculate the total for all the objects
-        total = sum([obj.attributes.get("value", 0) for obj in objs]) // 2
+        total = (
+            sum([obj.attributes.get("value", 0) * _quantity(obj) for obj in objs]) // 2
+        )
 
         # confirm that this is what the player wants to buy
-        confirm = yield (
-            f"Do you want to trade in {obj_name} for {total} experience? Yes/No"
-        )
+        _reserve(objs)
+        try:
+            confirm = yield (
+                f"Do you want to trade in {obj_name} for {total} experience? Yes/No"
+            )
+        except GeneratorExit:
+            # the question was abandoned, e.g. by logging out, so put everything back
+            _release(objs)
+            raise
+        _reserve(objs, False)
 
         # if it's not a form of yes, cancel
         if confirm.lower().strip() not in ("yes", "y"):
             self.msg("Donation cancelled.")
+            _restack(objs)
             return
 
         # everything is good! do a capitalism!
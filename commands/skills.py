@@ -47,7 +47,7 @@ class CmdStatSheet(Command):
         self.msg("SKILLS")
         skills = []
         for skill_key in sorted(SKILL_DICT.keys()):
-            if skill := caller.traits.get(skill_key):
+            if skill := caller.get_skill(skill_key):
                 skills.append((skill.name, int(skill.value)))
         rows = list(zip(*skills))
         if not rows:
@@ -151,6 +151,8 @@ class CmdTrainSkill(Command):
 
         caller.db.exp -= exp_cost
         skill.base += levels
+        # the skill snapshot is out of date now
+        caller.ndb.skills = None
         self.msg(f"You practice your {to_train} and improve it to level {skill.base}.")
 
 
@@ -30,7 +30,15 @@ def at_server_start():
     This is called every time the server starts up, regardless of
     how it was shut down.
     """
-    pass
+    from evennia import GLOBAL_SCRIPTS
+
+    # rebuild the in-memory spawn cap counts from the database
+    GLOBAL_SCRIPTS.spawn_counter.recount()
+
+    from world.recipes.index import RECIPE_INDEX
+
+    # index the crafting recipes by the tags they need
+    RECIPE_INDEX.build()
 
 
 def at_server_stop():
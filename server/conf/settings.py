@@ -93,6 +93,22 @@ AUTO_CREATE_CHARACTER_WITH_ACCOUNT = False
 AUTO_PUPPET_ON_LOGIN = False
 MAX_NR_CHARACTERS = 3
 
+# Global Scripts - https://www.evennia.com/docs/latest/Components/Scripts.html
+GLOBAL_SCRIPTS = {
+    "spawn_counter": {
+        "typeclass": "typeclasses.scripts.SpawnCounterScript",
+        "desc": "Counts spawned resource nodes and mobs in each overworld biome.",
+    },
+    "npc_ai": {
+        "typeclass": "typeclasses.scripts.BehaviorScript",
+        "desc": "Runs queued NPC reactions from a single tick.",
+    },
+    "room_reaper": {
+        "typeclass": "typeclasses.scripts.RoomReaperScript",
+        "desc": "Frees up overworld rooms which have had no players for a while.",
+    },
+}
+
 # EvMenu Login - https://www.evennia.com/docs/latest/Contribs/Contrib-Menu-Login.html
 CMDSET_UNLOGGEDIN = "evennia.contrib.base_systems.menu_login.UnloggedinCmdSet"
 CONNECTION_SCREEN_MODULE = "evennia.contrib.base_systems.menu_login.connection_screens"
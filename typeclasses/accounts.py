@@ -28,6 +28,47 @@ from evennia.contrib.rpg.character_creator.character_creator import (
 )
 
 
+class AccountSettings:
+    """
+    An in-memory copy of an account's game settings, so they can be checked without
+    loading the settings attribute each time.
+
+    Changes made with `set` are written through to the account's `settings` attribute.
+    """
+
+    __slots__ = ("account", "auto_attack", "auto_prompt")
+
+    # maps each setting's display name to its attribute on this object, with its default
+    # if it's never been saved - new accounts save their own starting settings on creation
+    OPTIONS = {
+        "auto attack": ("auto_attack", False),
+        "auto prompt": ("auto_prompt", False),
+    }
+
+    def __init__(self, account):
+        self.account = account
+        stored = account.attributes.get("settings") or {}
+        for name, (attr, default) in self.OPTIONS.items():
+            setattr(self, attr, bool(stored.get(name, default)))
+
+    def __contains__(self, name):
+        return name in self.OPTIONS
+
+    def get(self, name):
+        """Get the current value of a setting by its display name"""
+        return getattr(self, self.OPTIONS[name][0])
+
+    def set(self, name, value):
+        """Change a setting by its display name, saving it to the account"""
+        setattr(self, self.OPTIONS[name][0], bool(value))
+        self.account.attributes.add("settings", dict(self.items()))
+
+    def items(self):
+        """Iterate over all the settings as (display name, value) pairs"""
+        for name, (attr, _) in self.OPTIONS.items():
+            yield name, getattr(self, attr)
+
+
 class Account(ContribChargenAccount):
     """
     This class describes the actual OOC account (i.e. the user connecting
@@ -95,6 +136,13 @@ class Account(ContribChargenAccount):
 
     """
 
+    @property
+    def game_settings(self):
+        """This account's game settings, loaded once and kept in memory"""
+        if (settings := self.ndb.game_settings) is None:
+            settings = self.ndb.game_settings = AccountSettings(self)
+        return settings
+
     def at_account_creation(self):
         super().at_account_creation()
         # Initialize game settings
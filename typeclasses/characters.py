@@ -1,19 +1,170 @@
-from random import randint, choice
+from collections import Counter, namedtuple
+from random import randint
 from string import punctuation
+from time import time
 from evennia import AttributeProperty
-from evennia.utils import lazy_property, iter_to_str, delay, logger
+from evennia.utils import lazy_property, iter_to_str, logger
+from evennia.utils.containers import GLOBAL_SCRIPTS
 from evennia.contrib.rpg.traits import TraitHandler
 from evennia.contrib.game_systems.clothing.clothing import (
     ClothedCharacter,
     get_worn_clothes,
 )
 from evennia.contrib.game_systems.cooldowns import CooldownHandler
-from evennia.prototypes.spawner import spawn
 
-from .objects import ObjectParent
+from world.spawning import bulk_spawn
+from .objects import ObjectParent, ListenerProperty, StatProperty
 
 _IMMOBILE = ("sitting", "lying down", "unconscious")
 _MAX_CAPACITY = 10
+# the traits shown in the status line, and the trait data which affects how they display
+_STATUS_TRAITS = ("hp", "ep", "fp")
+_STATUS_TRAIT_KEYS = ("current", "base", "mod", "mult", "min", "max", "rate")
+# how long a status line is good for while a trait is regenerating
+_STATUS_TICK = 1
+
+# a snapshot of a skill: its display name, its level, and its level plus the related stat bonus
+SkillLevel = namedtuple("SkillLevel", ("name", "value", "total"))
+
+
+class WieldHandler:
+    """
+    Keeps track of which hand is holding what.
+
+    The hand slots are kept in memory and only written back to the character's
+    attribute when they change. Anything which has been deleted since it was wielded
+    is treated as an empty hand.
+    """
+
+    def __init__(self, obj, db_attribute="_wielded"):
+        self.obj = obj
+        self.db_attribute = db_attribute
+        self.reload()
+
+    def reload(self):
+        """Re-read the hand slots from the database"""
+        hands = self.obj.attributes.get(self.db_attribute, {})
+        self.slots = dict(hands.deserialize() if hands else {})
+        self._held = {obj for obj in self.slots.values() if obj}
+
+    def reset(self, hands=("left", "right")):
+        """Set up the given hands, all empty, replacing any existing slots"""
+        self.slots = {hand: None for hand in hands}
+        self._save()
+
+    def _save(self):
+        # don't write back anything that's been deleted
+        self.slots = {
+            hand: obj if obj and obj.pk else None for hand, obj in self.slots.items()
+        }
+        self._held = {obj for obj in self.slots.values() if obj}
+        self.obj.attributes.add(self.db_attribute, self.slots)
+
+    @property
+    def wielding(self):
+        """A list of all wielded objects"""
+        return [obj for obj in self.slots.values() if obj and obj.pk]
+
+    @property
+    def free(self):
+        """A list of all empty hands"""
+        return [hand for hand, obj in self.slots.items() if not (obj and obj.pk)]
+
+    def is_wielding(self, obj):
+        """Check if obj is held in any hand"""
+        return bool(obj in self._held and obj.pk)
+
+    def get(self, hand):
+        """Get whatever is held in hand, or None"""
+        if (obj := self.slots.get(hand)) and obj.pk:
+            return obj
+        return None
+
+    def wield(self, obj, hands):
+        """Put obj in each of the given hands"""
+        for hand in hands:
+            self.slots[hand] = obj
+        self._save()
+
+    def unwield(self, obj):
+        """
+        Release obj from every hand holding it.
+
+        Returns:
+            freed (list): the hands which were holding obj
+        """
+        freed = [hand for hand, held in self.slots.items() if held == obj]
+        if freed:
+            for hand in freed:
+                self.slots[hand] = None
+            self._save()
+        return freed
+
+
+class BufferedTraitHandler(TraitHandler):
+    """
+    A TraitHandler which can keep its gauges in memory, e.g. during a fight, so that every
+    hit and every regen tick doesn't save the whole trait attribute.
+
+    Buffered gauges work exactly the same, including regenerating, and are written back to
+    the database in a single save with `flush`.
+    """
+
+    def __init__(self, obj, db_attribute_key="traits", db_attribute_category="traits"):
+        super().__init__(
+            obj,
+            db_attribute_key=db_attribute_key,
+            db_attribute_category=db_attribute_category,
+        )
+        # the base handler doesn't allow setting anything else on it
+        object.__setattr__(
+            self, "_storage", (obj, db_attribute_key, db_attribute_category)
+        )
+        object.__setattr__(self, "buffered", {})
+
+    def get_data(self, trait_key):
+        """Get a trait's current data, whether it's buffered or not"""
+        if (data := self.buffered.get(trait_key)) is not None:
+            return data
+        return self.trait_data[trait_key]
+
+    def buffer(self):
+        """
+        Start keeping all of our gauges in memory, until they're flushed with `release`.
+        """
+        for trait_key in self.all():
+            if trait_key in self.buffered:
+                continue
+            trait = self.get(trait_key)
+            if trait.trait_type != "gauge":
+                continue
+            # the trait works from an in-memory copy of its data instead of the database
+            data = self.trait_data[trait_key].deserialize()
+            self.buffered[trait_key] = data
+            trait._data = data
+
+    def flush(self, release=False):
+        """
+        Save any buffered gauges back to the database, all at once.
+
+        Args:
+            release (bool): If True, also stop buffering the gauges.
+        """
+        if not self.buffered:
+            return
+        obj, db_attribute_key, db_attribute_category = self._storage
+        data = self.trait_data.deserialize()
+        data.update((key, value) for key, value in self.buffered.items() if key in data)
+        obj.attributes.add(db_attribute_key, data, category=db_attribute_category)
+        # reconnect to the newly saved data, so everything unbuffered saves to it
+        self.trait_data = obj.attributes.get(
+            db_attribute_key, category=db_attribute_category
+        )
+        if release:
+            self.buffered.clear()
+        for trait_key, trait in self._cache.items():
+            if trait_key not in self.buffered:
+                trait._data = self.trait_data[trait_key]
 
 
 class Character(ObjectParent, ClothedCharacter):
@@ -22,19 +173,41 @@ class Character(ObjectParent, ClothedCharacter):
     """
 
     gender = AttributeProperty("plural")
+    # base stats, which add a bonus to their related skills
+    str = StatProperty(5, autocreate=False)
+    agi = StatProperty(5, autocreate=False)
+    will = StatProperty(5, autocreate=False)
+    # natural armor and resistances, which add to any worn gear
+    armor = AttributeProperty(0, autocreate=False)
+    resistances = AttributeProperty(None, autocreate=False)
+
+    @property
+    def combat(self):
+        """The combat instance we're fighting in here, or None"""
+        # this is set and cleared by the combat instance as we join and leave
+        combat_script = self.ndb.combat
+        if combat_script and combat_script.pk and combat_script.obj == self.location:
+            return combat_script
+        return None
+
+    @property
+    def account_settings(self):
+        """The game settings of the account puppeting us, or None if we aren't puppeted"""
+        if (settings := self.ndb.account_settings) is None and (
+            account := self.account
+        ):
+            settings = self.ndb.account_settings = account.game_settings
+        return settings
+
+    @property
+    def listening(self):
+        """True if this character reacts to other characters arriving and leaving"""
+        return False
 
     @property
     def in_combat(self):
         """Return True if in combat, otherwise False"""
-        if not (location := self.location):
-            # can't be in combat if we're nowhere!
-            return False
-        if not (combat_script := location.scripts.get("combat")):
-            # there is no combat instance in this location
-            return False
-
-        # return whether we're in the combat instance's combatants
-        return self in combat_script[0].fighters
+        return self.combat is not None
 
     @property
     def can_flee(self):
@@ -57,39 +230,51 @@ class Character(ObjectParent, ClothedCharacter):
     @lazy_property
     def traits(self):
         # this adds the handler as .traits
-        return TraitHandler(self)
+        return BufferedTraitHandler(self)
 
     @lazy_property
     def cooldowns(self):
         return CooldownHandler(self, db_attribute="cooldowns")
 
+    @lazy_property
+    def hands(self):
+        return WieldHandler(self)
+
     @property
     def wielding(self):
         """Access a list of all wielded objects"""
-        return [obj for obj in self.attributes.get("_wielded", {}).values() if obj]
+        return self.hands.wielding
 
     @property
     def free_hands(self):
-        return [
-            key for key, val in self.attributes.get("_wielded", {}).items() if not val
-        ]
+        return self.hands.free
 
     def defense(self, damage_type=None):
         """
-        Get the total armor defense from equipped items and natural defenses
-
-        The damage_type keyword is unused by default.
-        """
-        return sum(
-            [obj.attributes.get("armor", 0) for obj in get_worn_clothes(self) + [self]]
-        )
+        Get the total armor defense from equipped items and natural defenses, plus
+        any resistances to damage_type.
+
+        The worn gear is cached until we put something on or take something off. Its armor
+        is read fresh every time, so changing it directly takes effect straight away.
+        """
+        if (gear := self.ndb.worn_gear) is None:
+            gear = self.ndb.worn_gear = get_worn_clothes(self)
+        # anything deleted or taken away since doesn't protect us anymore
+        gear = [obj for obj in gear if obj.pk and obj.location == self] + [self]
+        total = sum(obj.attributes.get("armor", 0) for obj in gear)
+        if damage_type:
+            total += sum(
+                (obj.attributes.get("resistances") or {}).get(damage_type, 0)
+                for obj in gear
+            )
+        return total
 
     def at_object_creation(self):
         # basic stats
         # i could - and wanted to - use the traits handler for these, but then i couldn't set them in NPC prototypes
-        self.db.str = 5
-        self.db.agi = 5
-        self.db.will = 5
+        self.str = 5
+        self.agi = 5
+        self.will = 5
         # resource stats
         self.traits.add(
             "hp", "Health", trait_type="gauge", min=0, max=100, base=100, rate=0.1
@@ -129,10 +314,36 @@ class Character(ObjectParent, ClothedCharacter):
         """
         super().at_post_move(source_location, **kwargs)
         # check if we have auto-prompt in settings
-        if self.account and (settings := self.account.db.settings):
-            if settings.get("auto prompt"):
-                status = self.get_display_status(self)
-                self.msg(prompt=status)
+        if (settings := self.account_settings) and settings.auto_prompt:
+            self.update_prompt()
+
+    def at_post_puppet(self, **kwargs):
+        """
+        Load the puppeting account's settings.
+        """
+        super().at_post_puppet(**kwargs)
+        self.ndb.account_settings = self.account.game_settings
+
+    def at_post_unpuppet(self, account=None, session=None, **kwargs):
+        """
+        Forget the previous account's settings.
+        """
+        super().at_post_unpuppet(account=account, session=session, **kwargs)
+        self.ndb.account_settings = None
+
+    def at_server_reload(self, **kwargs):
+        """
+        Save any traits buffered in memory, e.g. from a fight in progress.
+        """
+        super().at_server_reload(**kwargs)
+        self.traits.flush()
+
+    def at_server_shutdown(self, **kwargs):
+        """
+        Save any traits buffered in memory, e.g. from a fight in progress.
+        """
+        super().at_server_shutdown(**kwargs)
+        self.traits.flush()
 
     def at_damage(self, attacker, damage, damage_type=None):
         """
@@ -145,17 +356,19 @@ class Character(ObjectParent, ClothedCharacter):
         self.msg(f"You take {damage} damage from {attacker.get_display_name(self)}.")
         attacker.msg(f"You deal {damage} damage to {self.get_display_name(attacker)}.")
         if self.traits.hp.value <= 0:
-            self.tags.add("unconscious", category="status")
-            self.tags.add("lying down", category="status")
+            self.add_status("unconscious", "lying down")
             self.msg(
                 "You fall unconscious. You can |wrespawn|n or wait to be |wrevive|nd."
             )
             self.traits.hp.rate = 0
-            if self.in_combat:
-                combat = self.location.scripts.get("combat")[0]
+            if combat := self.combat:
+                # mark us as out of the fight before leaving it, so victory is checked correctly
+                combat.set_defeated(self)
                 if not combat.remove_combatant(self):
                     # something went wrong...
-                    logger.log_err(f"Could not remove defeated character from combat! Character: {self.name} (#{self.id}) Location: {self.location.name} (#{self.location.id})")
+                    logger.log_err(
+                        f"Could not remove defeated character from combat! Character: {self.name} (#{self.id}) Location: {self.location.name} (#{self.location.id})"
+                    )
                     return
 
     def at_emote(self, message, **kwargs):
@@ -180,11 +393,6 @@ class Character(ObjectParent, ClothedCharacter):
         """
         Wield a weapon in one or both hands
         """
-        # fetch the wielded info and detach from the DB
-        wielded = self.attributes.get("_wielded", {})
-        if wielded:
-            wielded.deserialize()
-
         # which hand (or "hand") we'll wield it in
         # get all available hands
         free = self.free_hands
@@ -193,7 +401,7 @@ class Character(ObjectParent, ClothedCharacter):
             # if a specific hand was requested, check if it's available
             if hand not in free:
                 # check if this is even a valid hand by trying to get what's in it
-                if not (weap := wielded.get(hand)):
+                if not (weap := self.hands.get(hand)):
                     # no weapon was got, so it's not there
                     self.msg(f"You do not have a {hand}.")
                 else:
@@ -216,8 +424,6 @@ class Character(ObjectParent, ClothedCharacter):
                 return
             # put the weapon as wielded in the first two hands
             hands = free[:2]
-            for hand in hands:
-                wielded[hand] = weapon
         else:
             if not hand:
                 # check handedness first, then find a hand
@@ -227,10 +433,9 @@ class Character(ObjectParent, ClothedCharacter):
                     hand = free[0]
             # put the weapon as wielded in the hand
             hands = [hand]
-            wielded[hand] = weapon
 
         # update the character with the new wielded info
-        self.db._wielded = wielded
+        self.hands.wield(weapon, hands)
         # return the list of hands that are now holding the weapon
         return hands
 
@@ -238,30 +443,41 @@ class Character(ObjectParent, ClothedCharacter):
         """
         Stop wielding a weapon
         """
-        # fetch the wielded info and detach from the DB
-        wielded = self.attributes.get("_wielded", {})
-        if wielded:
-            wielded.deserialize()
-
         # can't unwield a weapon you aren't wielding
-        if weapon not in wielded.values():
+        if not self.hands.is_wielding(weapon):
             self.msg("You are not wielding that.")
             return
 
-        # replace weapon with an instance of a bare hand
-        freed = []
-        for hand, weap in wielded.items():
-            if weap == weapon:
-                # create a correctly-named fist
-                wielded[hand] = None
-                # append the hand to the list of freed hands
-                freed.append(hand)
-
-        # update the character with the new wielded info
-        self.db._wielded = wielded
+        # empty out every hand holding the weapon
+        freed = self.hands.unwield(weapon)
         # return the list of hands that are no longer holding the weapon
         return freed
 
+    def get_skill(self, skill_name):
+        """
+        Get a skill's level, and its level plus any stat bonus, from the in-memory snapshot
+        of our skills.
+
+        The snapshot is cleared whenever a skill is trained or a stat changes.
+
+        Returns:
+            skill (SkillLevel or None): the skill's snapshot, or None if we don't know it
+        """
+        if (cache := self.ndb.skills) is None:
+            cache = self.ndb.skills = {}
+        if skill_name not in cache:
+            skill = None
+            if skill_trait := self.traits.get(skill_name):
+                # check if this skill has a related base stat
+                stat_bonus = 0
+                if stat := getattr(skill_trait, "stat", None):
+                    # get the stat to be a modifier
+                    stat_bonus = self.attributes.get(stat, 0)
+                value = skill_trait.value
+                skill = SkillLevel(skill_trait.name, value, value + stat_bonus)
+            cache[skill_name] = skill
+        return cache[skill_name]
+
     def use_skill(self, skill_name, *args, **kwargs):
         """
         Attempt to use a skill, applying any stat bonus as necessary.
@@ -270,15 +486,10 @@ class Character(ObjectParent, ClothedCharacter):
         if not skill_name:
             return 1
         # if we don't have the skill, we can't use it
-        if not (skill_trait := self.traits.get(skill_name)):
+        if not (skill := self.get_skill(skill_name)):
             return 0
-        # check if this skill has a related base stat
-        stat_bonus = 0
-        if stat := getattr(skill_trait, "stat", None):
-            # get the stat to be a modifier
-            stat_bonus = self.attributes.get(stat, 0)
-        # finally, return the skill plus stat
-        return skill_trait.value + stat_bonus
+        # the skill plus stat
+        return skill.total
 
     def get_display_status(self, looker, **kwargs):
         """
@@ -290,18 +501,54 @@ class Character(ObjectParent, ClothedCharacter):
         if looker != self:
             chunks.append(self.get_display_name(looker, **kwargs))
 
+        # if we're checking our own status, include cooldowns
+        chunks.append(self.get_status_line(cooldowns=looker == self))
+
+        # glue together the chunks and return
+        return " - ".join(chunks)
+
+    def get_status_line(self, cooldowns=False):
+        """
+        Renders our resource levels and status flags, and optionally our cooldowns.
+
+        The rendered line is cached until a trait or cooldown changes, a status is added or
+        removed with `add_status`/`remove_status`, or a regenerating trait or running cooldown
+        ticks over.
+        """
+        now = time()
+        trait_data = {trait: self.traits.get_data(trait) for trait in _STATUS_TRAITS}
+        cooldown_data = self.cooldowns.data if cooldowns else {}
+
+        def _cache_key():
+            return tuple(
+                trait_data[trait].get(key)
+                for trait in _STATUS_TRAITS
+                for key in _STATUS_TRAIT_KEYS
+            ) + tuple(cooldown_data.items())
+
+        if (cache := self.ndb.status) is None:
+            cache = self.ndb.status = {}
+        if cached := cache.get(cooldowns):
+            key, expires, line = cached
+            if key == _cache_key() and (expires is None or now < expires):
+                return line
+
         # add resource levels
-        chunks.append(
+        chunks = [
             f"Health {self.traits.hp.percent()} : Energy {self.traits.ep.percent()} : Focus {self.traits.fp.percent()}"
-        )
+        ]
 
         # get all the current status flags for this character
         if status_tags := self.tags.get(category="status", return_list=True):
             # add these statuses to the string, if there are any
             chunks.append(iter_to_str(status_tags))
 
-        if looker == self:
-            # if we're checking our own status, include cooldowns
+        expires = None
+        if any(trait_data[trait].get("last_update") for trait in _STATUS_TRAITS):
+            # a trait is regenerating, so its percentage will change soon
+            expires = now + _STATUS_TICK
+
+        if cooldowns:
             all_cooldowns = [
                 (key, self.cooldowns.time_left(key, use_int=True))
                 for key in self.cooldowns.all
@@ -309,9 +556,43 @@ class Character(ObjectParent, ClothedCharacter):
             all_cooldowns = [f"{c[0]} ({c[1]}s)" for c in all_cooldowns if c[1]]
             if all_cooldowns:
                 chunks.append(f"Cooldowns: {iter_to_str(all_cooldowns, endsep=',')}")
+            # the line changes when the next cooldown's remaining seconds tick down
+            if running := [end for end in cooldown_data.values() if end > now]:
+                tick = min(end - int(end - now) for end in running)
+                expires = min(expires, tick) if expires else tick
 
-        # glue together the chunks and return
-        return " - ".join(chunks)
+        line = " - ".join(chunks)
+        # reading the traits can update their data, so the key is taken afterwards
+        cache[cooldowns] = (_cache_key(), expires, line)
+        return line
+
+    def add_status(self, *statuses):
+        """
+        Flag this character with one or more statuses, e.g. "unconscious"
+        """
+        for status in statuses:
+            self.tags.add(status, category="status")
+        self.ndb.status = None
+
+    def remove_status(self, *statuses):
+        """
+        Remove one or more status flags from this character
+        """
+        for status in statuses:
+            self.tags.remove(status, category="status")
+        self.ndb.status = None
+
+    def update_prompt(self, force=False):
+        """
+        Send our status as a prompt, if it's changed since the last prompt we sent.
+
+        Args:
+            force (bool): If True, send the prompt even if it hasn't changed.
+        """
+        status = self.get_display_status(self)
+        if force or status != self.ndb.prompt:
+            self.ndb.prompt = status
+            self.msg(prompt=status)
 
     def at_character_arrive(self, chara, **kwargs):
         """
@@ -332,12 +613,13 @@ class Character(ObjectParent, ClothedCharacter):
         # this function receives the actor doing the revive so you could implement your own skill check
         # however, we don't have any relevant skills
         if self.tags.has("unconscious"):
-            self.tags.remove("unconscious")
-            self.tags.remove("lying down")
+            self.remove_status("unconscious", "lying down")
             # this sets the current HP to 20% of the max, a.k.a. one fifth
             self.traits.hp.current = self.traits.hp.current.max // 5
-            self.msg(prompt=self.get_display_status(self))
+            self.update_prompt()
             self.traits.hp.rate = 0.1
+            if combat := self.combat:
+                combat.set_defeated(self, False)
 
 
 class PlayerCharacter(Character):
@@ -348,7 +630,7 @@ class PlayerCharacter(Character):
     def at_object_creation(self):
         super().at_object_creation()
         # initialize hands
-        self.db._wielded = {"left": None, "right": None}
+        self.hands.reset(("left", "right"))
 
     def get_display_name(self, looker, **kwargs):
         """
@@ -377,8 +659,7 @@ class PlayerCharacter(Character):
     def at_damage(self, attacker, damage, damage_type=None):
         super().at_damage(attacker, damage, damage_type=damage_type)
         if self.traits.hp.value < 50:
-            status = self.get_display_status(self)
-            self.msg(prompt=status)
+            self.update_prompt()
 
     def attack(self, target, weapon, **kwargs):
         """
@@ -416,25 +697,26 @@ class PlayerCharacter(Character):
         # attack with the weapon
         weapon.at_attack(self, target)
 
-        status = self.get_display_status(self)
-        self.msg(prompt=status)
+        self.update_prompt()
 
         # check if we have auto-attack in settings
-        if self.account and (settings := self.account.db.settings):
-            if settings.get("auto attack") and (speed := weapon.speed):
-                # queue up next attack; use None for target to reference stored target on execution
-                delay(speed + 1, self.attack, None, weapon, persistent=True)
+        if (settings := self.account_settings) and settings.auto_attack:
+            if speed := weapon.speed:
+                # queue up next attack with the combat instance
+                if combat := self.combat:
+                    combat.schedule(self, weapon, speed + 1)
 
     def respawn(self):
         """
         Resets the character back to the spawn point with full health.
         """
-        self.tags.remove("unconscious", category="status")
-        self.tags.remove("lying down", category="status")
+        self.remove_status("unconscious", "lying down")
+        if combat := self.combat:
+            combat.set_defeated(self, False)
         self.traits.hp.reset()
         self.traits.hp.rate = 0.1
         self.move_to(self.home)
-        self.msg(prompt=self.get_display_status(self))
+        self.update_prompt()
 
 
 class NPC(Character):
@@ -444,6 +726,15 @@ class NPC(Character):
 
     # defines what color this NPC's name will display in
     name_color = AttributeProperty("w")
+    # how this NPC reacts to other characters, e.g. "aggressive" or "timid"
+    react_as = ListenerProperty("", autocreate=False)
+    # a character this NPC will follow when they leave
+    following = ListenerProperty(None, autocreate=False)
+
+    @property
+    def listening(self):
+        """True if this NPC reacts to other characters arriving and leaving"""
+        return "aggressive" in (self.react_as or "") or bool(self.following)
 
     # property to mimic weapons
     @property
@@ -460,27 +751,40 @@ class NPC(Character):
         name = super().get_display_name(looker, **kwargs)
         return f"|{self.name_color}{name}|n"
 
+    def at_object_delete(self):
+        """
+        Remove this NPC from its biome's spawn count before it's deleted, whether it
+        was defeated or ran off.
+        """
+        GLOBAL_SCRIPTS.spawn_counter.release(self)
+        if (location := self.location) and (listeners := location.ndb.listeners):
+            listeners.discard(self)
+        return super().at_object_delete()
+
+    def at_object_post_creation(self):
+        """
+        Subscribe to our starting room, now that our attributes have been set.
+        """
+        super().at_object_post_creation()
+        if self.listening and (location := self.location):
+            location.ndb.listeners = None
+
     def at_character_arrive(self, chara, **kwargs):
         """
         Respond to the arrival of a character
         """
-        if "aggressive" in self.attributes.get("react_as", ""):
-            delay(0.1, self.enter_combat, chara)
+        if "aggressive" in (self.react_as or ""):
+            GLOBAL_SCRIPTS.npc_ai.add_reaction(self, "aggro", chara)
 
     def at_character_depart(self, chara, destination, **kwargs):
         """
         Respond to the departure of a character
         """
-        if chara == self.db.following:
-            # find an exit that goes the same way
-            exits = [
-                x
-                for x in self.location.contents_get(content_type="exit")
-                if x.destination == destination
-            ]
-            if exits:
-                # use the exit
-                self.execute_cmd(exits[0].name)
+        if chara == self.following:
+            # go the same way on the next AI tick
+            GLOBAL_SCRIPTS.npc_ai.add_reaction(
+                self, "follow", chara, destination=destination
+            )
 
     def at_damage(self, attacker, damage, damage_type=None):
         """
@@ -491,32 +795,29 @@ class NPC(Character):
         if self.traits.hp.value <= 0:
             # we've been defeated!
             # create loot drops
-            objs = spawn(*list(self.db.drops))
-            for obj in objs:
-                obj.location = self.location
+            drops = Counter(self.db.drops or [])
+            bulk_spawn(*[(key, count, self.location) for key, count in drops.items()])
             # delete ourself
             self.delete()
             return
 
-        if "timid" in self.attributes.get("react_as", ""):
-            self.at_emote("flees!")
-            self.db.fleeing = True
-            if combat_script := self.location.scripts.get("combat"):
-                combat_script = combat_script[0]
-                if not combat_script.remove_combatant(self):
-                    return
+        if "timid" in (self.react_as or ""):
             # there's a 50/50 chance the object will escape forever
             if randint(0, 1):
+                if (combat := self.combat) and not combat.remove_combatant(self):
+                    return
+                self.at_emote("flees!")
+                self.db.fleeing = True
                 self.move_to(None)
                 self.delete()
             else:
-                flee_dir = choice(self.location.contents_get(content_type="exit"))
-                flee_dir.at_traverse(self, flee_dir.destination)
+                # otherwise, bolt for an exit on the next AI tick, without waiting for an opening
+                GLOBAL_SCRIPTS.npc_ai.add_reaction(self, "flee", panic=True)
             return
 
         threshold = self.attributes.get("flee_at", 25)
         if self.traits.hp.value <= threshold:
-            self.execute_cmd("flee")
+            GLOBAL_SCRIPTS.npc_ai.add_reaction(self, "flee")
 
         # change target to the attacker
         if not self.db.combat_target:
@@ -534,15 +835,12 @@ class NPC(Character):
             weapon = self
 
         self.at_emote("$conj(charges) at {target}!", mapping={"target": target})
-        location = self.location
 
-        if not (combat_script := location.scripts.get("combat")):
-            # there's no combat instance; start one
-            from typeclasses.scripts import CombatScript
+        if not (combat_script := self.combat):
+            # join the fight here, or start one
+            from typeclasses.scripts import get_or_create_combat_script
 
-            location.scripts.add(CombatScript, key="combat")
-            combat_script = location.scripts.get("combat")
-        combat_script = combat_script[0]
+            combat_script = get_or_create_combat_script(self.location)
 
         self.db.combat_target = target
         # adding a combatant to combat just returns True if they're already there, so this is safe
@@ -573,8 +871,9 @@ class NPC(Character):
 
         # attack with the weapon
         weapon.at_attack(self, target)
-        # queue up next attack; use None for target to reference stored target on execution
-        delay(weapon.speed + 1, self.attack, None, weapon, persistent=True)
+        # queue up next attack with the combat instance
+        if combat := self.combat:
+            combat.schedule(self, weapon, weapon.speed + 1)
 
     def at_pre_attack(self, wielder, **kwargs):
         """
@@ -61,6 +61,7 @@ class Exit(ObjectParent, DefaultExit):
         # try to enter the wilderness
         if wilderness.enter_wilderness(traveller, coordinates=coords, name=map_name):
             # it succeeded! call the post-traversal hooks
+            traveller.location.at_object_receive(traveller, self.location)
             traveller.at_post_move(self.location, **kwargs)
             self.at_post_traverse(traveller, self.location, **kwargs)
         else:
@@ -84,11 +85,17 @@ class OverworldExit(ObjectParent, wilderness.WildernessExit):
 
         This isn't really ideal, but due to the way the wilderness contrib works, it's necessary.
         """
+        location = self.location
         super().at_traverse(traveller, destination, **kwargs)
         # compare new location to our location
-        if traveller.location != self.location:
+        if traveller.location != location:
             # they moved to a new place! call the hook
-            traveller.location.at_object_receive(traveller, self.location)
+            traveller.location.at_object_receive(traveller, location)
+            # moving within the wilderness doesn't call the leave hook either
+            if location.coordinates:
+                location.at_last_player_leave(traveller)
+                # the room is only freed during the move, so check again now it's folded up
+                location.wilderness._destroy_room(location)
 
 
 class XYGridExit(ObjectParent, XYZExit):
@@ -76,7 +76,7 @@ class MeleeWeapon(Object):
             wielder.msg("You can't attack again yet.")
             return False
         # this can only be used if it's being wielded
-        if self not in wielder.wielding:
+        if not wielder.hands.is_wielding(self):
             wielder.msg(
                 f"You must be wielding your {self.get_display_name(wielder)} to attack with it."
             )
@@ -12,11 +12,38 @@ inheritance.
 """
 
 from random import randint
-from evennia.prototypes import spawner, prototypes
+from evennia import AttributeProperty
 from evennia.objects.objects import DefaultObject
 from evennia.contrib.game_systems.clothing import ContribClothing
+from evennia.prototypes.prototypes import PROTOTYPE_TAG_CATEGORY
+from evennia.utils import create, delay
+from evennia.utils.containers import GLOBAL_SCRIPTS
 
 from commands.interact import GatherCmdSet
+from world.spawning import bulk_spawn
+
+
+class ListenerProperty(AttributeProperty):
+    """
+    An AttributeProperty for anything that decides whether an object reacts to characters
+    moving around it. Assigning to it clears the listener registry of the object's location.
+    """
+
+    def at_set(self, value, obj):
+        if location := obj.location:
+            location.ndb.listeners = None
+        return value
+
+
+class StatProperty(AttributeProperty):
+    """
+    An AttributeProperty for a character's base stats. Assigning to it clears the
+    character's skill snapshot, since each stat adds a bonus to its related skills.
+    """
+
+    def at_set(self, value, obj):
+        obj.ndb.skills = None
+        return value
 
 
 class ObjectParent:
@@ -30,6 +57,34 @@ class ObjectParent:
 
     """
 
+    def get_stacked_results(self, results, **kwargs):
+        """
+        Find just the requested number of items when a stacked search finds a stackable
+        object, e.g. `get 5 apples` from a stack of thirty.
+
+        If the items are spread over several stacks, they're taken from each stack in
+        turn until there are enough - or until there are none left, same as the default.
+        The stacks themselves are returned, marked with how many items to take from each;
+        they're only split up once they're actually moved.
+        """
+        amount = kwargs.get("stacked", 0)
+        if amount > 0 and results:
+            stacks = [obj for obj in results if isinstance(obj, StackableObject)]
+            # only handle this ourselves if every result is part of the same pile of items
+            if (
+                len(stacks) == len(results)
+                and len({obj.stack_key for obj in stacks}) == 1
+            ):
+                taken = []
+                for stack in stacks:
+                    if amount <= 0:
+                        break
+                    stack.request(min(amount, stack.quantity))
+                    amount -= stack.quantity
+                    taken.append(stack)
+                return True, taken
+        return super().get_stacked_results(results, **kwargs)
+
 
 class Object(ObjectParent, DefaultObject):
     """
@@ -181,13 +236,199 @@ class Object(ObjectParent, DefaultObject):
         """
         Make sure that wielded weapons are unwielded.
         """
-        if self in dropper.wielding:
+        if dropper.hands.is_wielding(self):
             dropper.at_unwield(self)
         super().at_drop(dropper, **kwargs)
 
 
 class ClothingObject(ObjectParent, ContribClothing):
-    pass
+    # flat damage reduction while worn
+    armor = AttributeProperty(0, autocreate=False)
+    # extra damage reduction against specific damage types, as {damage_type: amount}
+    resistances = AttributeProperty(None, autocreate=False)
+
+    def wear(self, wearer, wearstyle, quiet=False):
+        """
+        Wear this item, updating the wearer's defense.
+        """
+        super().wear(wearer, wearstyle, quiet=quiet)
+        wearer.ndb.worn_gear = None
+
+    def remove(self, wearer, quiet=False):
+        """
+        Take this item off, updating the wearer's defense.
+        """
+        super().remove(wearer, quiet=quiet)
+        wearer.ndb.worn_gear = None
+
+
+class StackableObject(Object):
+    """
+    A single object which represents a whole pile of identical items, e.g. thirty berries.
+
+    Stacks of the same item merge together when they end up in the same place, and only
+    part of a stack is split off when a command asks for a specific number of items.
+    """
+
+    quantity = AttributeProperty(1)
+
+    @property
+    def stack_key(self):
+        """
+        What identifies a stack: only stacks of the same prototype and name can merge.
+        """
+        return (self.tags.get(category=PROTOTYPE_TAG_CATEGORY), self.key)
+
+    def get_numbered_name(self, count, looker, **kwargs):
+        """
+        Numbers the name by how many items are in the stack, rather than how many stacks there are.
+        """
+        count *= self.ndb.requested or self.quantity
+        names = super().get_numbered_name(count, looker, **kwargs)
+        if count == 1 or kwargs.get("return_string"):
+            return names
+        # a single stack of many items should always be described as many items
+        return names[1], names[1]
+
+    def request(self, amount):
+        """
+        Mark only some of the items in this stack to be taken by the current command.
+
+        The stack is split when it's moved, and the mark is dropped once the command is done,
+        so nothing changes if the command stops before moving anything.
+
+        Args:
+            amount (int): How many items to take.
+        """
+        self.ndb.requested = amount if amount < self.quantity else None
+        delay(0, self._clear_request)
+
+    def _clear_request(self):
+        self.ndb.requested = None
+
+    def take_requested(self):
+        """
+        Split off the items marked by `request`, e.g. to set them aside for a sale.
+
+        Returns:
+            stack (StackableObject): The requested items, or this stack if it was all requested.
+        """
+        amount, self.ndb.requested = self.ndb.requested, None
+        return self.split(amount) if amount else self
+
+    def move_to(self, destination, **kwargs):
+        """
+        Only moves the items requested by a stacked search, leaving the rest where they are.
+        """
+        if not (amount := self.ndb.requested):
+            return super().move_to(destination, **kwargs)
+        self.ndb.requested = None
+        # leave the rest of the stack behind, so the moved stack keeps its identity
+        rest = self.split(self.quantity - amount)
+        if super().move_to(destination, **kwargs):
+            return True
+        # the move was refused, so put the stack back together
+        self.quantity += rest.quantity
+        rest.delete()
+        return False
+
+    def split(self, amount):
+        """
+        Split some of the items off of this stack into a new stack in the same location.
+
+        Args:
+            amount (int): How many items to split off.
+
+        Returns:
+            stack (StackableObject): The new stack, or this one if `amount` is the whole stack.
+        """
+        if amount >= self.quantity:
+            return self
+        # create the new stack nowhere, so it isn't moved anywhere and doesn't restack
+        stack = create.object(
+            self.typeclass_path,
+            key=self.key,
+            home=self.home,
+            locks=self.db_lock_storage,
+            aliases=self.aliases.all(),
+            attributes=[
+                (attr.key, attr.value, attr.category, attr.lock_storage)
+                for attr in self.attributes.all()
+                if attr.key != "quantity"
+            ]
+            + [("quantity", amount)],
+            tags=[
+                (tag.db_key, tag.db_category, tag.db_data)
+                for tag in self.tags.all(return_objs=True)
+            ],
+        )
+        # then put it right next to us, without any move hooks
+        stack.location = self.location
+        self.quantity -= amount
+        return stack
+
+    @property
+    def in_use(self):
+        """
+        Whether this stack is wielded or worn by whoever is carrying it.
+        """
+        if self.db.worn:
+            return True
+        hands = getattr(self.location, "hands", None)
+        return bool(hands and hands.is_wielding(self))
+
+    def consume(self, amount=1):
+        """
+        Use up some of the items in this stack, deleting it if there are none left.
+        """
+        if amount >= self.quantity:
+            if hands := getattr(self.location, "hands", None):
+                # don't leave a hand holding nothing
+                hands.unwield(self)
+            self.delete()
+        else:
+            self.quantity -= amount
+
+    def restack(self):
+        """
+        Merge any other stacks of the same item in this stack's location into this one.
+
+        Stacks which are wielded or worn are left alone, although they can take in others.
+        """
+        if not self.pk or not self.location:
+            # we've been deleted or merged into something else in the meantime
+            return self
+        if self.ndb.reserved:
+            # we're set aside for something in progress, e.g. a sale waiting to be confirmed
+            return self
+        stack_key = self.stack_key
+        for obj in self.location.contents:
+            if (
+                obj != self
+                and isinstance(obj, StackableObject)
+                and not obj.ndb.reserved
+                and obj.stack_key == stack_key
+                and not obj.in_use
+            ):
+                self.quantity += obj.quantity
+                obj.delete()
+        return self
+
+    def at_post_move(self, source_location, **kwargs):
+        """
+        Merge with any matching stacks in our new location, once the move has finished.
+        """
+        super().at_post_move(source_location, **kwargs)
+        # this waits until after the current command, so that any messages still describe
+        # the items that were actually moved
+        delay(0, self._restack_after_move, self.location)
+
+    def _restack_after_move(self, destination):
+        """
+        Restack once a move has finished, as long as we haven't gone anywhere else since.
+        """
+        if self.location == destination:
+            self.restack()
 
 
 class GatherNode(Object):
@@ -205,6 +446,13 @@ class GatherNode(Object):
     def get_display_footer(self, looker, **kwargs):
         return "You can |wgather|n from this."
 
+    def at_object_delete(self):
+        """
+        Remove this node from its biome's spawn count before it's deleted.
+        """
+        GLOBAL_SCRIPTS.spawn_counter.release(self)
+        return super().at_object_delete()
+
     def at_gather(self, chara, **kwargs):
         """
         Creates the actual material object for the player to collect.
@@ -228,15 +476,14 @@ class GatherNode(Object):
         # grab a randomized amount to spawn
         amt = randint(1, min(remaining, 3))
 
-        # spawn the items!
-        objs = spawner.spawn(*[proto_key] * amt)
-        for obj in objs:
-            # move to the gathering character
-            obj.location = chara
+        # spawn the items directly into the gathering character's inventory
+        report = bulk_spawn((proto_key, amt, chara))
+        # stackable materials come out as a single stack of all of them
+        name = report.objects[-1].get_numbered_name(report.count, chara)[1]
 
         if amt == remaining:
-            chara.msg(f"You collect the last {obj.get_numbered_name(amt, chara)[1]}.")
+            chara.msg(f"You collect the last {name}.")
             self.delete()
         else:
-            chara.msg(f"You collect {obj.get_numbered_name(amt, chara)[1]}.")
+            chara.msg(f"You collect {name}.")
             self.db.gathers -= amt
@@ -6,15 +6,26 @@ Rooms are simple containers that has no location of their own.
 """
 
 from evennia.utils import create, iter_to_str, logger
+from evennia.utils.evtable import EvTable
+from evennia.objects.models import ObjectDB
 from evennia.objects.objects import DefaultRoom
+from evennia.prototypes.prototypes import PROTOTYPE_TAG_CATEGORY
 from evennia.contrib.grid.xyzgrid.xyzroom import XYZRoom
 from evennia.contrib.grid.wilderness.wilderness import WildernessRoom
 
-from .objects import ObjectParent
+from .objects import ObjectParent, StackableObject
 from .scripts import RestockScript
 
 from commands.shops import ShopCmdSet
 from commands.skills import TrainCmdSet
+from world.maps.overworld import TERRAIN, get_minimap
+
+
+def _quantity(obj):
+    """
+    How many items an object counts as - more than one, if it's a stack
+    """
+    return obj.quantity if isinstance(obj, StackableObject) else 1
 
 
 class RoomParent(ObjectParent):
@@ -22,6 +33,22 @@ class RoomParent(ObjectParent):
     A mixin for logic that should be applied to all rooms.
     """
 
+    @property
+    def listeners(self):
+        """
+        The objects here which react to characters arriving and leaving.
+
+        This is built from the room's contents the first time it's needed and kept up to
+        date as listeners come and go.
+        """
+        if (listeners := self.ndb.listeners) is None:
+            listeners = self.ndb.listeners = {
+                obj
+                for obj in self.contents_get(content_type="character")
+                if obj.listening
+            }
+        return listeners
+
     def at_object_receive(self, mover, source_location, move_type=None, **kwargs):
         """
         Apply extra hooks when an object enters this room, so things (e.g. NPCs) can react.
@@ -29,7 +56,11 @@ class RoomParent(ObjectParent):
         super().at_object_receive(mover, source_location, **kwargs)
         # only react if the arriving object is a character
         if "character" in mover._content_types:
-            for obj in self.contents_get(content_type="character"):
+            listeners = self.listeners
+            if mover.listening:
+                listeners.add(mover)
+            # copy the listeners, since reacting can move them out of the room
+            for obj in tuple(listeners):
                 if obj == mover:
                     # don't react to ourself
                     continue
@@ -45,27 +76,40 @@ class RoomParent(ObjectParent):
             combat.remove_combatant(mover)
         # only react if the arriving object is a character
         if "character" in mover._content_types:
-            for obj in self.contents_get(content_type="character"):
-                if obj == mover:
-                    # don't react to ourself
-                    continue
+            listeners = self.listeners
+            listeners.discard(mover)
+            for obj in tuple(listeners):
                 obj.at_character_depart(mover, destination, **kwargs)
 
     def get_display_footer(self, looker, **kwargs):
         """
         Shows a list of commands available here to the viewer.
-        """
 
-        cmd_keys = [
-            f"|w{cmd.key}|n"
-            for cmdset in self.cmdset.all()
-            for cmd in cmdset
-            if cmd.access(looker, "cmd")
-        ]
-        if cmd_keys:
-            return f"Special commands here: {', '.join(cmd_keys)}"
-        else:
-            return ""
+        The footer is cached for each combination of cmdsets on the room and permissions
+        of the viewer, so adding or removing a cmdset gives a fresh footer.
+        """
+        cmdsets = self.cmdset.all()
+        account = looker.account
+        cache_key = (
+            tuple(cmdset.path for cmdset in cmdsets),
+            looker.is_superuser,
+            tuple(sorted(looker.permissions.all())),
+            tuple(sorted(account.permissions.all())) if account else (),
+        )
+        if (footers := self.ndb.footers) is None:
+            footers = self.ndb.footers = {}
+        if cache_key not in footers:
+            cmd_keys = [
+                f"|w{cmd.key}|n"
+                for cmdset in cmdsets
+                for cmd in cmdset
+                if cmd.access(looker, "cmd")
+            ]
+            if cmd_keys:
+                footers[cache_key] = f"Special commands here: {', '.join(cmd_keys)}"
+            else:
+                footers[cache_key] = ""
+        return footers[cache_key]
 
 
 class Room(RoomParent, DefaultRoom):
@@ -87,20 +131,54 @@ class OverworldRoom(RoomParent, WildernessRoom):
     A subclass of the Wilderness contrib's room, applying the local RoomParent mixin
     """
 
+    # how many tiles in each direction the minimap shows
+    minimap_radius = 2
+
     def get_display_header(self, looker, **kwargs):
         """
         Displays a minimap above the room description, if there is one.
         """
-        if not self.ndb.minimap:
-            self.ndb.minimap = self.db.minimap
-        return self.ndb.minimap or ""
+        if not (coordinates := self.coordinates):
+            return ""
+        return get_minimap(coordinates, self.minimap_radius)
 
     def at_server_reload(self, **kwargs):
         """
-        Saves the current ndb desc to db so it's still available after a reload
+        Saves the current ndb desc to db so it's still available after a reload, but only
+        for rooms which have something in them.
+        """
+        if any(obj.destination != self for obj in self.contents):
+            self.db.desc = self.ndb.active_desc
+        elif self.attributes.has("desc"):
+            self.attributes.remove("desc")
+
+    def at_object_receive(self, mover, source_location, move_type=None, **kwargs):
+        """
+        Wakes up any mobs left here when a player arrives, e.g. in a room that was kept
+        around by something else and so never got new coordinates.
+        """
+        if mover.has_account and (coordinates := self.coordinates):
+            if biome := (TERRAIN.get_tile(coordinates) or {}).get("biome"):
+                self.wilderness.mapprovider.wake_mobs(self, coordinates, biome)
+        super().at_object_receive(mover, source_location, move_type=move_type, **kwargs)
+
+    def at_last_player_leave(self, leaving):
+        """
+        If the leaving character is the last player here, fold any mobs here back into
+        dormant descriptors so they don't keep the room alive.
+        """
+        if not leaving.has_account or not self.coordinates:
+            return
+        if any(obj.has_account for obj in self.contents if obj != leaving):
+            return
+        self.wilderness.mapprovider.fold_mobs(self)
+
+    def at_object_leave(self, mover, destination, **kwargs):
+        """
+        Folds up the mobs here before the wilderness decides whether to free the room.
         """
-        self.db.desc = self.ndb.active_desc
-        self.db.minimap = self.ndb.minimap
+        self.at_last_player_leave(mover)
+        super().at_object_leave(mover, destination, **kwargs)
 
 
 class XYGridRoom(RoomParent, XYZRoom):
@@ -132,20 +210,200 @@ class XYGridShop(XYGridRoom):
         )
         self.scripts.add(RestockScript, key="restock", autostart=False)
 
+    @property
+    def catalogue(self):
+        """
+        An index of everything for sale, mapping `(prototype, name)` to a dict of the
+        item's lowest price, how many are in stock, and the ids of the objects holding them.
+
+        This is built from the storage contents the first time it's needed after a reload,
+        and kept up to date by `add_stock` and `take_stock` from then on.
+        """
+        if self.ndb.catalogue is None:
+            self.ndb.catalogue = {}
+            if storage := self.db.storage:
+                for obj in storage.contents:
+                    self._index_stock(obj)
+        return self.ndb.catalogue
+
+    def _stock_key(self, obj):
+        """
+        The catalogue key for an item
+        """
+        return (obj.tags.get(category=PROTOTYPE_TAG_CATEGORY), obj.key)
+
+    def _index_stock(self, obj):
+        """
+        Adds an object in storage to the catalogue, if it's for sale
+        """
+        if not (price := obj.db.price):
+            return
+        entry = self.ndb.catalogue.setdefault(
+            self._stock_key(obj), {"price": price, "count": 0, "ids": []}
+        )
+        if obj.id in entry["ids"]:
+            return
+        # stock can be priced differently, e.g. if its value has changed; list the lowest
+        entry["price"] = min(entry["price"], price)
+        entry["ids"].append(obj.id)
+        entry["count"] += _quantity(obj)
+
+    def find_stock(self, name):
+        """
+        Find the catalogue keys for items for sale matching a name
+
+        Returns:
+            list: The matching keys, preferring exact matches.
+        """
+        name = name.strip().lower()
+        keys = list(self.catalogue)
+        if matches := [key for key in keys if key[1].lower() == name]:
+            return matches
+        # try partial matches, allowing for plurals like "arrows"
+        return [key for key in keys if name in key[1].lower() or key[1].lower() in name]
+
     def add_stock(self, obj):
         """
         Adds new objects to the shop's sale stock
         """
         if storage := self.db.storage:
             # only do this if there's a storage location set
-            obj.location = storage
+            if obj.location != storage:
+                obj.location = storage
             # price is double the sale value
             val = obj.db.value or 0
             obj.db.price = val * 2
+            if isinstance(obj, StackableObject):
+                # combine it with any of the same thing that's already in stock
+                obj.restack()
+                if self.ndb.catalogue is not None:
+                    # this stack holds all of them now
+                    self.ndb.catalogue.pop(self._stock_key(obj), None)
+            if self.ndb.catalogue is not None:
+                # if it hasn't been built yet, it'll pick this up when it is
+                self._index_stock(obj)
+            self.ndb.listing = None
             return True
         else:
             return False
 
+    def _stock_objects(self, key):
+        """
+        The objects holding an item in the catalogue, cheapest first.
+
+        Anything which has been removed from storage some other way is dropped from the
+        catalogue, and the entry is removed entirely if there's nothing left.
+        """
+        if not (entry := self.catalogue.get(key)):
+            return []
+        storage = self.db.storage
+        objs = []
+        for dbid in list(entry["ids"]):
+            obj = ObjectDB.objects.get_id(dbid)
+            if not obj or obj.location != storage:
+                entry["ids"].remove(dbid)
+                continue
+            objs.append(obj)
+        if not objs:
+            del self.catalogue[key]
+            self.ndb.listing = None
+            return []
+        objs.sort(key=lambda obj: obj.db.price or 0)
+        count, price = sum(_quantity(obj) for obj in objs), objs[0].db.price
+        if (count, price) != (entry["count"], entry["price"]):
+            entry["count"], entry["price"] = count, price
+            self.ndb.listing = None
+        return objs
+
+    def quote_stock(self, key, amount):
+        """
+        Prices some of an item in the shop's sale stock, without taking anything out of it.
+
+        Args:
+            key (tuple): The catalogue key of the item.
+            amount (int): How many of the item are wanted.
+
+        Returns:
+            tuple or None: An example object from stock, how many of the item are
+                available up to `amount`, and their total price - or None if there are none.
+        """
+        if not (objs := self._stock_objects(key)):
+            return None
+        count = total = 0
+        for obj in objs:
+            if count >= amount:
+                break
+            # the same items, in the same order, as take_stock would take
+            num = min(amount - count, _quantity(obj))
+            count += num
+            total += num * (obj.db.price or 0)
+        return objs[0], count, total
+
+    def take_stock(self, key, amount):
+        """
+        Takes some of an item out of the shop's sale stock, e.g. because it's been bought.
+
+        Args:
+            key (tuple): The catalogue key of the item.
+            amount (int): How many of the item to take.
+
+        Returns:
+            list: The objects taken out of stock, cheapest first and split off of stacks
+                as needed. These are removed from storage; it's up to the caller to move
+                them somewhere, or to put them back with `add_stock`.
+
+        Notes:
+            Use `quote_stock` to check what something would cost before taking it.
+        """
+        if not (objs := self._stock_objects(key)):
+            return []
+        entry = self.catalogue[key]
+        taken = []
+        for obj in objs:
+            if amount <= 0:
+                break
+            piece = obj.split(amount) if isinstance(obj, StackableObject) else obj
+            amount -= _quantity(piece)
+            entry["count"] -= _quantity(piece)
+            if piece == obj:
+                # we took the whole thing
+                entry["ids"].remove(obj.id)
+            # set it aside so it can't get restacked before it's handed over
+            piece.location = None
+            taken.append(piece)
+
+        if entry["count"] <= 0 or not entry["ids"]:
+            del self.catalogue[key]
+        self.ndb.listing = None
+        return taken
+
+    def stock_count(self, prototype):
+        """
+        How many items from a prototype are currently in stock
+        """
+        # prototype tags are always lowercase
+        prototype = prototype.lower()
+        return sum(
+            entry["count"]
+            for key, entry in self.catalogue.items()
+            if key[0] == prototype
+        )
+
+    def get_listing(self):
+        """
+        Gets the table of everything for sale, only re-rendering it when the stock changes.
+
+        Returns:
+            str: The rendered table, or an empty string if nothing is for sale.
+        """
+        if self.ndb.listing is None:
+            catalogue = self.catalogue
+            table = EvTable("Item", "Amt", "Price", border="rows")
+            for (_, name), entry in catalogue.items():
+                table.add_row(name, entry["count"], entry["price"])
+            self.ndb.listing = str(table) if catalogue else ""
+        return self.ndb.listing
+
 
 class XYGridTrain(XYGridRoom):
     """
@@ -1,8 +1,35 @@
+import heapq
+from collections import Counter, deque
+from itertools import count
 from random import randint, choice
+from time import time, perf_counter
+from django.db.models import Count
 from evennia.utils import make_iter, logger
+from evennia.objects.models import ObjectDB
 from evennia.scripts.scripts import DefaultScript
-from evennia.prototypes.prototypes import PROTOTYPE_TAG_CATEGORY
-from evennia.prototypes.spawner import spawn
+from evennia.typeclasses.tags import Tag
+from evennia.contrib.grid.wilderness.wilderness import WildernessScript
+
+from world.maps.overworld import WILDERNESS_NAME
+from world.spawning import bulk_spawn
+from .gear import BareHand
+
+# status tags which mean a combatant is out of the fight
+_DEFEATED_STATUSES = ("unconscious", "dead", "defeated")
+
+# how often, in seconds, a fight saves its combatants' buffered traits
+_TRAIT_CHECKPOINT = 60
+
+# the tag categories used to mark spawned objects with their biome
+_SPAWN_TAG_CATEGORIES = ("resource_node", "mob")
+
+# the most NPC reactions handled in a single AI tick; the rest wait for the next one
+_AI_TICK_BUDGET = 200
+
+# how many seconds an overworld room can go without players before it's freed up
+_ROOM_IDLE_TIME = 300
+# how many spare overworld rooms to keep for reuse; any more are deleted
+_MAX_UNUSED_ROOMS = 50
 
 
 class Script(DefaultScript):
@@ -13,6 +40,42 @@ class Script(DefaultScript):
     pass
 
 
+class CombatState:
+    """
+    The in-memory membership of a combat instance: a set of combatants for each team,
+    which team each combatant is on, and which combatants have been defeated.
+    """
+
+    __slots__ = ("teams", "team_of", "defeated")
+
+    def __init__(self, teams=None):
+        self.teams = (set(), set())
+        self.team_of = {}
+        self.defeated = set()
+        for team, members in enumerate(teams or []):
+            for obj in members:
+                if obj:
+                    self.add(obj, team)
+
+    def add(self, combatant, team):
+        self.teams[team].add(combatant)
+        self.team_of[combatant] = team
+
+    def remove(self, combatant):
+        """
+        Returns:
+            int or None: The team the combatant was removed from, if they were in one.
+        """
+        team = self.team_of.pop(combatant, None)
+        if team is not None:
+            self.teams[team].discard(combatant)
+        self.defeated.discard(combatant)
+        return team
+
+    def serialize(self):
+        return [list(members) for members in self.teams]
+
+
 class CombatScript(Script):
     """
     A script intended to be attached to a room when a combat instance starts.
@@ -20,46 +83,213 @@ class CombatScript(Script):
     Manages the combat within the room; assumes all combat has two sides.
     """
 
+    @property
+    def state(self):
+        """
+        The combat instance's in-memory membership, loaded from the database as needed.
+        """
+        return self.ndb.state or self._load_state()
+
+    def _load_state(self):
+        state = CombatState(self.attributes.get("teams"))
+        # look up everyone who's already been defeated in one go
+        if state.team_of:
+            state.defeated.update(
+                ObjectDB.objects.filter(
+                    id__in=[obj.id for obj in state.team_of],
+                    db_tags__db_key__in=_DEFEATED_STATUSES,
+                    db_tags__db_category="status",
+                )
+            )
+        self.ndb.state = state
+        # let everyone know which fight they're in
+        for combatant in state.team_of:
+            self._enlist(combatant)
+        return state
+
+    def _enlist(self, combatant):
+        """
+        Point a combatant at this fight, and keep their traits in memory while they're in it.
+        """
+        combatant.ndb.combat = self
+        if traits := getattr(combatant, "traits", None):
+            traits.buffer()
+
+    def _save_traits(self, combatant, release=False):
+        """
+        Save a combatant's buffered traits, optionally going back to saving them directly.
+        """
+        if traits := getattr(combatant, "traits", None):
+            traits.flush(release=release)
+
     @property
     def teams(self):
         """
-        Returns a list of lists, where the inner lists are all members of combat teams
+        Returns a tuple of sets, where the sets are all members of combat teams
         """
-        if not self.ndb.teams:
-            if teams := self.db.teams:
-                self.ndb.teams = teams.deserialize()
-        return self.ndb.teams
+        return self.state.teams
 
     @property
     def fighters(self):
         """
         Returns a list of all combatants, regardless of alliance.
         """
-        a, b = self.teams
-        return [obj for obj in a + b if obj]
+        return list(self.state.team_of)
 
     @property
     def active(self):
         """
         Returns a list of all active combatants, regardless of alliance.
         """
-        return [
-            obj
-            for obj in self.fighters
-            if not any(obj.tags.has(["unconscious", "dead", "defeated"]))
-        ]
+        state = self.state
+        return [obj for obj in state.team_of if obj not in state.defeated]
+
+    def set_defeated(self, combatant, defeated=True):
+        """
+        Mark a combatant as defeated - or no longer defeated - without removing them.
+        """
+        if combatant not in self.state.team_of:
+            return
+        if defeated:
+            self.state.defeated.add(combatant)
+        else:
+            self.state.defeated.discard(combatant)
+
+    @property
+    def queue(self):
+        """
+        The combat scheduler: a heap of `[time, sequence, combatant, weapon]` entries for
+        everyone's next action, restored from the reload checkpoint if there is one.
+        """
+        if self.ndb.queue is None:
+            self.ndb.sequence = count()
+            self.ndb.queue = []
+            # maps each combatant to the sequence number of their one valid queue entry
+            self.ndb.scheduled = {}
+            for when, combatant, weapon in self.attributes.get("queue", []):
+                if combatant:
+                    self.schedule(combatant, weapon or BareHand(), when - time())
+            self.attributes.remove("queue")
+        return self.ndb.queue
+
+    def at_init(self):
+        """
+        Reload the combat state whenever the script is loaded, so combatants get their
+        references to this fight back after a server reload.
+        """
+        if self.pk and self.attributes.has("teams"):
+            self._load_state()
 
     def at_script_creation(self):
         self.db.teams = [[], []]
+        # all scheduled combat actions are run from a single tick
+        self.interval = 1
+
+    def at_repeat(self):
+        """
+        Run every scheduled action that's come due.
+        """
+        queue = self.queue
+        now = time()
+        # checkpoint everyone's buffered traits every so often
+        if (checkpoint := self.ndb.checkpoint) is None:
+            self.ndb.checkpoint = now + _TRAIT_CHECKPOINT
+        elif now >= checkpoint:
+            self.ndb.checkpoint = now + _TRAIT_CHECKPOINT
+            for combatant in self.state.team_of:
+                self._save_traits(combatant)
+
+        while queue and queue[0][0] <= now:
+            _, seq, combatant, weapon = heapq.heappop(queue)
+            if self.ndb.scheduled.get(combatant) != seq:
+                # this action was cancelled or replaced
+                continue
+            del self.ndb.scheduled[combatant]
+            try:
+                # use None for target to reference the stored target on execution
+                combatant.attack(None, weapon)
+            except Exception:
+                logger.log_trace(
+                    f"Error in combat action for {combatant} (#{combatant.id})"
+                )
+                # keep them in the fight rather than leaving them without a next action
+                if (
+                    self.pk
+                    and combatant.pk
+                    and combatant not in self.ndb.scheduled
+                    and combatant in self.active
+                ):
+                    self.schedule(combatant, weapon, getattr(weapon, "speed", 0) + 1)
+            if not self.pk:
+                # that ended the fight
+                return
+
+    def at_server_reload(self):
+        """
+        Checkpoint the scheduled actions so the fight can pick back up after the reload.
+        """
+        self._checkpoint_queue()
+
+    def at_server_shutdown(self):
+        """
+        Checkpoint the scheduled actions so the fight can pick back up after a restart.
+        """
+        self._checkpoint_queue()
+
+    def _checkpoint_queue(self):
+        """
+        Save the valid entries of the in-memory queue to the database.
+        """
+        scheduled = self.ndb.scheduled or {}
+        self.db.queue = [
+            # weapons which aren't real objects, like bare hands, are recreated on load
+            (when, combatant, weapon if hasattr(weapon, "pk") else None)
+            for when, seq, combatant, weapon in self.queue
+            if scheduled.get(combatant) == seq
+        ]
+
+    def at_script_delete(self):
+        """
+        Save the traits of everyone still here once the fight is over.
+        """
+        for combatant in self.state.team_of:
+            self._save_traits(combatant, release=True)
+        return True
+
+    def schedule(self, combatant, weapon, delay):
+        """
+        Schedule a combatant's next attack, replacing anything they already have queued.
+
+        Args:
+            combatant (Character): The one taking the action.
+            weapon (Object): What they're attacking with.
+            delay (int or float): How many seconds from now the action should happen.
+        """
+        queue = self.queue
+        seq = next(self.ndb.sequence)
+        self.ndb.scheduled[combatant] = seq
+        heapq.heappush(queue, [time() + delay, seq, combatant, weapon])
+
+    def unschedule(self, combatant):
+        """
+        Cancel any scheduled actions for a combatant.
+        """
+        if scheduled := self.ndb.scheduled:
+            scheduled.pop(combatant, None)
 
     def get_team(self, combatant):
         """
         Gets the index of the team containing combatant, or None if combatant is not in this combat
         """
-        for i, team in enumerate(self.teams):
-            if combatant in team:
-                return i
-        return None
+        return self.state.team_of.get(combatant)
+
+    def _join(self, combatant, team):
+        """
+        Put a combatant on a team, saving the new team membership.
+        """
+        self.state.add(combatant, team)
+        self._enlist(combatant)
+        self.db.teams = self.state.serialize()
 
     def add_combatant(self, combatant, ally=None, enemy=None, **kwargs):
         """
@@ -68,7 +298,7 @@ class CombatScript(Script):
         Returns:
             True if combatant is successfully in the combat instance, False if not
         """
-        if combatant in self.fighters:
+        if combatant in self.state.team_of:
             # already in combat here
             return True
 
@@ -77,31 +307,24 @@ class CombatScript(Script):
             return False
 
         # if ally is given, find ally's team
-        if ally and (team := self.get_team(ally)):
+        if ally and (team := self.get_team(ally)) is not None:
             # add combatant to ally's team
-            self.db.teams[team].append(combatant)
-            # reset the cache
-            del self.ndb.teams
+            self._join(combatant, team)
             return True
 
         # if enemy is given, find enemy's team
-        if enemy and (team := self.get_team(enemy)):
-            # since there are only 2 teams, subtracting 1 from the team index will flip to the other team
-            team -= 1
-
-            # add combatant to the team
-            self.db.teams[team].append(combatant)
-            # reset the cache
-            del self.ndb.teams
+        if enemy and (team := self.get_team(enemy)) is not None:
+            # since there are only 2 teams, this flips to the other team
+            self._join(combatant, 1 - team)
             return True
 
         # if we got here, then no one provided was in combat already
         # we can only work with this if this is a clean combat instance
-        if enemy and not self.fighters:
+        if enemy and not self.state.team_of:
             # set up new 1v1 teams
-            self.db.teams = [[combatant], [enemy]]
-            # reset the cache
-            del self.ndb.teams
+            self.state.add(enemy, 1)
+            self._enlist(enemy)
+            self._join(combatant, 0)
             return True
 
         # at this point, there are no valid ways to add
@@ -114,20 +337,21 @@ class CombatScript(Script):
         Returns:
             True if combatant is successfully out of combat, False if not
         """
-        # get the combatant's team
-        team = self.get_team(combatant)
+        # remove combatant from their team
+        team = self.state.remove(combatant)
         if team is None:
             # they're already not in combat
             return True
-
-        # remove combatant from their team
-        self.db.teams[team].remove(combatant)
-        # reset the cache
-        del self.ndb.teams
+        self.db.teams = self.state.serialize()
+        if combatant.ndb.combat == self:
+            del combatant.ndb.combat
+        # they won't be taking any more actions here
+        self.unschedule(combatant)
+        self._save_traits(combatant, release=True)
 
         # grant exp to the other team, if relevant
         if exp := combatant.db.exp_reward:
-            for obj in self.db.teams[team - 1]:
+            for obj in self.state.teams[1 - team]:
                 obj.msg(f"You gain {exp} experience.")
                 obj.db.exp = (obj.db.exp or 0) + exp
         self.check_victory()
@@ -141,16 +365,16 @@ class CombatScript(Script):
 
         If one side is victorious, message the remaining members and delete ourself.
         """
-        if not (active_fighters := self.active):
+        state = self.state
+        # the still-active fighters on each team
+        team_a, team_b = [team - state.defeated for team in state.teams]
+        active_fighters = team_a | team_b
+
+        if not active_fighters:
             # everyone lost or is gone
             self.delete()
             return
 
-        # create a filtered list of only active fighters for each team
-        team_a, team_b = [
-            [obj for obj in team if obj in active_fighters] for team in self.db.teams
-        ]
-
         if team_a and team_b:
             # both teams are still active
             return
@@ -191,6 +415,265 @@ def get_or_create_combat_script(location):
     return combat_script
 
 
+class SpawnCounterScript(Script):
+    """
+    A global script which keeps count of how many spawned resource nodes and mobs
+    exist in each biome, so spawn caps can be checked without a database query.
+
+    The counts are kept in memory and rebuilt from the spawn tags on server start.
+
+    Overworld mobs which nobody is around to see are kept as dormant prototype keys
+    instead of objects, and still count towards their biome's cap.
+    """
+
+    @property
+    def counts(self):
+        """
+        Returns a dict of (biome, category) to the number of spawned objects
+        """
+        if self.ndb.counts is None:
+            self.recount()
+        return self.ndb.counts
+
+    def recount(self):
+        """
+        Rebuild the counts from the spawn tags in the database.
+        """
+        tags = (
+            Tag.objects.filter(
+                db_category__in=_SPAWN_TAG_CATEGORIES,
+                db_model="objectdb",
+                db_tagtype=None,
+            )
+            .annotate(total=Count("objectdb"))
+            .values_list("db_key", "db_category", "total")
+        )
+        counts = Counter(
+            {(biome, category): total for biome, category, total in tags if total}
+        )
+        # dormant mobs still count towards their biome's cap
+        for biome, mobs in self.dormant.items():
+            counts[(biome, "mob")] += sum(len(protkeys) for protkeys in mobs.values())
+        self.ndb.counts = counts
+
+    def get_count(self, biome, category):
+        """
+        Get the current number of spawned objects for a biome
+        """
+        return self.counts[(biome, category)]
+
+    def add(self, biome, category, amount=1):
+        """
+        Record newly spawned objects for a biome
+        """
+        self.counts[(biome, category)] += amount
+
+    def release(self, obj):
+        """
+        Remove a spawned object from the counts, e.g. when it's being deleted
+        """
+        for category in _SPAWN_TAG_CATEGORIES:
+            for biome in obj.tags.get(category=category, return_list=True):
+                counts = self.counts
+                counts[(biome, category)] = max(0, counts[(biome, category)] - 1)
+
+    @property
+    def dormant(self):
+        """
+        Returns the mobs which aren't currently spawned as objects, as a dict of
+        biome to {coordinates: [prototype keys]}
+        """
+        if self.ndb.dormant is None:
+            stored = self.attributes.get("dormant")
+            self.ndb.dormant = stored.deserialize() if stored else {}
+        return self.ndb.dormant
+
+    def fold(self, biome, coordinates, protkeys):
+        """
+        Record mobs at a set of coordinates as dormant, e.g. when their objects are
+        being deleted because nobody is around.
+        """
+        self.dormant.setdefault(biome, {}).setdefault(coordinates, []).extend(protkeys)
+        self.attributes.add("dormant", self.dormant)
+        self.add(biome, "mob", len(protkeys))
+
+    def wake(self, biome, coordinates):
+        """
+        Remove and return the dormant mobs at a set of coordinates, so they can be spawned.
+
+        Returns:
+            protkeys (list): the prototype keys of the mobs which were there
+        """
+        if not (protkeys := self.dormant.get(biome, {}).pop(coordinates, None)):
+            return []
+        self.attributes.add("dormant", self.dormant)
+        counts = self.counts
+        counts[(biome, "mob")] = max(0, counts[(biome, "mob")] - len(protkeys))
+        return protkeys
+
+
+class BehaviorScript(Script):
+    """
+    A global script which runs NPC reactions - aggro, follow and flee - from a single tick.
+
+    Reactions are queued in memory and handled in order, up to a budget per tick. Each
+    tick's report of how much was done and how long it took is kept in `ndb.report`.
+    """
+
+    def at_script_creation(self):
+        self.interval = 1
+
+    @property
+    def queue(self):
+        """
+        The pending reactions, as `(action, npc, location, target, kwargs)` tuples
+        """
+        if self.ndb.queue is None:
+            self.ndb.queue = deque()
+        return self.ndb.queue
+
+    def add_reaction(self, npc, action, target=None, **kwargs):
+        """
+        Queue up a reaction for the next AI tick.
+
+        Args:
+            npc (NPC): The one reacting.
+            action (str): The kind of reaction: "aggro", "follow" or "flee"
+            target (Character, optional): Who they're reacting to.
+
+        Keyword Args:
+            Passed on to the reaction, e.g. `destination` for following.
+        """
+        self.queue.append((action, npc, npc.location, target, kwargs))
+
+    def at_repeat(self):
+        """
+        Handle the queued reactions, up to this tick's budget.
+        """
+        start = perf_counter()
+        queue = self.queue
+        handlers = {"aggro": self._aggro, "follow": self._follow, "flee": self._flee}
+        # each room's exits are only looked up once per tick
+        exits = {}
+        processed = 0
+        while queue and processed < _AI_TICK_BUDGET:
+            action, npc, location, target, kwargs = queue.popleft()
+            processed += 1
+            if not npc.pk or npc.location != location:
+                # they're gone or have already moved on
+                continue
+            if location not in exits:
+                exits[location] = location.contents_get(content_type="exit")
+            try:
+                handlers[action](npc, target, exits[location], **kwargs)
+            except Exception:
+                logger.log_trace(f"Error in {action} reaction for {npc} (#{npc.id})")
+
+        self.ndb.report = {
+            "processed": processed,
+            "pending": len(queue),
+            "budget": _AI_TICK_BUDGET,
+            "time": perf_counter() - start,
+        }
+
+    def _aggro(self, npc, target, exits, **kwargs):
+        """Attack a character who's arrived"""
+        if target.pk and target.location == npc.location:
+            npc.enter_combat(target)
+
+    def _follow(self, npc, target, exits, destination=None, **kwargs):
+        """Go the same way as the character who just left"""
+        for exit_obj in exits:
+            if exit_obj.destination == destination:
+                if not exit_obj.access(npc, "traverse"):
+                    exit_obj.at_failed_traverse(npc)
+                    return
+                exit_obj.at_traverse(npc, destination)
+                return
+
+    def _flee(self, npc, target, exits, panic=False, **kwargs):
+        """Try to escape from combat - or from anything at all, if we're panicking"""
+        if not exits:
+            return
+        if not panic and not (npc.in_combat and npc.can_flee):
+            return
+        exit_obj = choice(exits)
+        if not exit_obj.access(npc, "traverse"):
+            # the way is blocked, so we're stuck fighting
+            exit_obj.at_failed_traverse(npc)
+            return
+        if (combat := npc.combat) and not combat.remove_combatant(npc):
+            return
+        npc.db.fleeing = True
+        npc.at_emote("flees!")
+        exit_obj.at_traverse(npc, exit_obj.destination)
+
+
+class RoomReaperScript(Script):
+    """
+    A global script which frees up overworld rooms that no player has been in for a while.
+
+    The wilderness keeps any room with items in it around, since it preserves items. Rooms
+    with no players in them for long enough are returned to the wilderness's pool of unused
+    rooms anyway: their mobs are folded up, and anything else is left at its coordinates to
+    come back when someone returns. Any spare rooms beyond what the pool keeps are deleted.
+    """
+
+    def at_script_creation(self):
+        self.interval = 60
+
+    def at_repeat(self):
+        """
+        Check every active overworld room for how long it's been without players.
+        """
+        wilderness = WildernessScript.objects.filter(db_key=WILDERNESS_NAME).first()
+        if not wilderness:
+            return
+
+        now = time()
+        # maps each idle room to when we first saw it idle
+        idle = self.ndb.idle or {}
+        still_idle = {}
+        for room in list(wilderness.db.rooms.values()):
+            if room.scripts.get("combat") or any(
+                obj.has_account for obj in room.contents
+            ):
+                continue
+            since = idle.get(room, now)
+            if now - since >= _ROOM_IDLE_TIME:
+                self.reclaim(wilderness, room)
+            else:
+                still_idle[room] = since
+        self.ndb.idle = still_idle
+
+        unused = wilderness.db.unused_rooms
+        while len(unused) > _MAX_UNUSED_ROOMS:
+            unused.pop().delete()
+
+    def reclaim(self, wilderness, room):
+        """
+        Put a room back into the wilderness's pool, leaving its contents on the map.
+
+        Args:
+            wilderness (WildernessScript): The wilderness the room belongs to.
+            room (WildernessRoom): The room to free up.
+        """
+        coordinates = room.ndb.active_coordinates
+        wilderness.mapprovider.fold_mobs(room)
+        itemcoordinates = wilderness.db.itemcoordinates
+        for obj in room.contents:
+            if obj.destination == room:
+                # the room's own exits stay with it
+                continue
+            if obj not in itemcoordinates:
+                # this was put here without any move hooks, e.g. split off of a stack
+                itemcoordinates[obj] = coordinates
+            obj.location = None
+        del wilderness.db.rooms[coordinates]
+        del room.ndb.active_coordinates
+        wilderness.db.unused_rooms.append(room)
+
+
 class RestockScript(Script):
     """
     A script for a shop room that periodically restocks its inventory.
@@ -212,21 +695,17 @@ class RestockScript(Script):
 
         # go through the inventory listing and possibly restock a few of everything
         for prototype, max_count in inventory:
-            # current stock of this type
-            in_stock = [
-                obj
-                for obj in storage.contents
-                if obj.tags.has(prototype, category=PROTOTYPE_TAG_CATEGORY)
-            ]
-            if len(in_stock) >= max_count:
+            # current stock of this type, from the shop's catalogue
+            in_stock = self.obj.stock_count(prototype)
+            if in_stock >= max_count:
                 # already enough of these
                 continue
             # get a random number of new stock, only process if >0
             if new_stock := randint(0, 3):
                 # cap it so we don't exceed max
-                new_stock = min(new_stock, max_count - len(in_stock))
+                new_stock = min(new_stock, max_count - in_stock)
                 # make some new stuff!
-                objs = spawn(*[prototype] * new_stock)
+                objs = bulk_spawn((prototype, new_stock, storage)).objects
                 # customize with the material options
                 for obj in objs:
                     # make sure it has an initial value
@@ -0,0 +1,34 @@
+"""
+Tests for custom account logic
+"""
+
+from evennia.utils.test_resources import EvenniaTest
+
+
+class TestAccountSettings(EvenniaTest):
+    def test_game_settings(self):
+        self.account.db.settings = {"auto attack": False, "auto prompt": True}
+        self.account.ndb.game_settings = None
+        settings = self.account.game_settings
+        self.assertIs(settings, self.account.game_settings)
+        self.assertFalse(settings.auto_attack)
+        self.assertTrue(settings.auto_prompt)
+        # changes are written through to the account
+        settings.set("auto attack", True)
+        self.assertTrue(settings.get("auto attack"))
+        self.assertEqual(
+            self.account.db.settings, {"auto attack": True, "auto prompt": True}
+        )
+
+    def test_unsaved_settings(self):
+        self.account.attributes.remove("settings")
+        self.account.ndb.game_settings = None
+        settings = self.account.game_settings
+        self.assertFalse(settings.auto_attack)
+        self.assertFalse(settings.auto_prompt)
+
+    def test_character_settings(self):
+        self.char1.ndb.account_settings = None
+        self.assertIs(self.char1.account_settings, self.account.game_settings)
+        self.char1.at_post_unpuppet(self.account)
+        self.assertIsNone(self.char1.ndb.account_settings)
@@ -3,6 +3,7 @@ Tests for custom character logic
 """
 
 from unittest.mock import MagicMock
+from evennia.utils import create
 from evennia.utils.test_resources import EvenniaTest
 
 
@@ -51,15 +52,67 @@ class TestCharacterDisplays(EvenniaTest):
             self.char1.get_display_status(self.char1),
         )
 
+    def test_status_cache(self):
+        status = self.char1.get_status_line()
+        self.assertIs(status, self.char1.get_status_line())
+        # changing a trait renders a new line
+        self.char1.traits.ep.rate = 0
+        self.char1.traits.ep.current = 50
+        self.assertIn("Energy 50.0%", self.char1.get_status_line())
+        self.char1.add_status("sitting")
+        self.assertIn("sitting", self.char1.get_status_line())
+        self.char1.remove_status("sitting")
+        self.assertNotIn("sitting", self.char1.get_status_line())
+
+    def test_update_prompt(self):
+        self.char1.msg = MagicMock()
+        self.char1.update_prompt()
+        self.char1.update_prompt()
+        self.char1.msg.assert_called_once()
+        self.char1.update_prompt(force=True)
+        self.assertEqual(self.char1.msg.call_count, 2)
+
 
 class TestCharacterProperties(EvenniaTest):
     def test_wielded_free_hands(self):
         self.char1.attributes.add(
             "_wielded", {"left hand": None, "right hand": self.obj1}
         )
+        self.char1.hands.reload()
         self.assertEqual(self.char1.wielding, [self.obj1])
         self.assertEqual(self.char1.free_hands, ["left hand"])
 
+    def test_player_hands(self):
+        player = create.object(
+            "typeclasses.characters.PlayerCharacter", key="Player", location=self.room1
+        )
+        # the handler was set up at creation, not just the attribute
+        self.assertEqual(player.free_hands, ["left", "right"])
+        player.at_wield(self.obj1)
+        self.assertEqual(player.wielding, [self.obj1])
+        self.assertEqual(player.attributes.get("_wielded")["left"], self.obj1)
+
+    def test_wield_handler(self):
+        self.char1.attributes.add("_wielded", {"left hand": None, "right hand": None})
+        self.char1.hands.reload()
+        self.obj1.tags.add("two_handed", category="wielded")
+        self.char1.at_wield(self.obj1)
+        self.assertTrue(self.char1.hands.is_wielding(self.obj1))
+        self.assertEqual(self.char1.free_hands, [])
+        # changes are written through to the database
+        self.assertEqual(
+            self.char1.attributes.get("_wielded"),
+            {"left hand": self.obj1, "right hand": self.obj1},
+        )
+        self.char1.at_unwield(self.obj1)
+        self.assertFalse(self.char1.hands.is_wielding(self.obj1))
+        self.assertEqual(self.char1.free_hands, ["left hand", "right hand"])
+        # a deleted object doesn't stay in hand
+        self.char1.at_wield(self.obj1)
+        self.obj1.delete()
+        self.assertEqual(self.char1.wielding, [])
+        self.assertEqual(self.char1.free_hands, ["left hand", "right hand"])
+
     def test_in_combat(self):
         self.assertFalse(self.char1.in_combat)
         from typeclasses.scripts import CombatScript
@@ -69,3 +122,69 @@ class TestCharacterProperties(EvenniaTest):
         self.assertFalse(self.char1.in_combat)
         combat_script.add_combatant(self.char1, enemy=self.char2)
         self.assertTrue(self.char1.in_combat)
+
+    def test_defense(self):
+        armor = create.object(
+            "typeclasses.objects.ClothingObject",
+            key="helmet",
+            location=self.char1,
+            attributes=[("armor", 3), ("resistances", {"fire": 2})],
+        )
+        self.assertEqual(self.char1.defense(), 0)
+        armor.wear(self.char1, True, quiet=True)
+        self.assertEqual(self.char1.defense(), 3)
+        self.assertEqual(self.char1.defense("fire"), 5)
+        armor.db.armor = 5
+        self.assertEqual(self.char1.defense(), 5)
+        armor.remove(self.char1, quiet=True)
+        self.assertEqual(self.char1.defense("fire"), 0)
+        # gear that's been deleted or moved away doesn't count, even if still marked worn
+        armor.wear(self.char1, True, quiet=True)
+        self.assertEqual(self.char1.defense(), 5)
+        armor.location = self.room1
+        self.assertEqual(self.char1.defense(), 0)
+        armor.location = self.char1
+        armor.delete()
+        self.assertEqual(self.char1.defense(), 0)
+
+    def test_skill_snapshot(self):
+        self.assertEqual(self.char1.use_skill("swords"), 0)
+        self.char1.traits.add(
+            "swords",
+            "Swords",
+            trait_type="counter",
+            min=0,
+            max=100,
+            base=10,
+            stat="str",
+        )
+        # the snapshot still remembers that we didn't know it
+        self.assertEqual(self.char1.use_skill("swords"), 0)
+        self.char1.ndb.skills = None
+        self.assertEqual(self.char1.use_skill("swords"), 15)
+        self.assertEqual(self.char1.get_skill("swords").value, 10)
+        self.char1.str = 8
+        self.assertEqual(self.char1.use_skill("swords"), 18)
+
+    def test_trait_buffer(self):
+        def saved_hp():
+            return self.char1.attributes.get("traits", category="traits")["hp"][
+                "current"
+            ]
+
+        # no regen, so the numbers stay put
+        self.char1.traits.hp.rate = 0
+        self.char1.traits.hp.current = 80
+        self.char1.traits.buffer()
+        self.char1.traits.hp.current -= 30
+        self.assertEqual(self.char1.traits.hp.current, 50)
+        self.assertEqual(saved_hp(), 80)
+        self.char1.traits.flush()
+        self.assertEqual(saved_hp(), 50)
+        # still buffered
+        self.char1.traits.hp.current -= 10
+        self.assertEqual(saved_hp(), 50)
+        self.char1.traits.flush(release=True)
+        self.assertEqual(saved_hp(), 40)
+        self.char1.traits.hp.current -= 10
+        self.assertEqual(saved_hp(), 30)
@@ -0,0 +1,131 @@
+"""
+Tests for custom object logic
+"""
+
+from unittest.mock import MagicMock, patch
+from evennia.utils import create
+from evennia.utils.test_resources import EvenniaTest
+
+
+class TestStackableObject(EvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.char1.msg = MagicMock()
+        self.stack = create.object(
+            "typeclasses.objects.StackableObject",
+            key="apple",
+            location=self.room1,
+            attributes=[("quantity", 30), ("energy", 5)],
+            tags=["edible"],
+        )
+
+    def test_get_numbered_name(self):
+        self.assertEqual(
+            self.stack.get_numbered_name(1, self.char1, return_string=True),
+            "30 apples",
+        )
+        self.stack.quantity = 1
+        self.assertEqual(self.stack.get_numbered_name(1, self.char1)[0], "an apple")
+
+    def test_split_restack(self):
+        part = self.stack.split(5)
+        self.assertNotEqual(part, self.stack)
+        self.assertEqual(part.location, self.room1)
+        self.assertEqual((part.quantity, self.stack.quantity), (5, 25))
+        self.assertTrue(part.tags.has("edible"))
+        self.assertEqual(self.stack.split(25), self.stack)
+        part.restack()
+        self.assertEqual(part.quantity, 30)
+        self.assertFalse(self.stack.pk)
+
+    @patch("typeclasses.objects.delay")
+    def test_split_deferred_restack(self, mock_delay):
+        def run_deferred():
+            calls, mock_delay.call_args_list = list(mock_delay.call_args_list), []
+            for call in calls:
+                call.args[1](*call.args[2:], **call.kwargs)
+
+        self.stack.location = self.char1
+        part = self.stack.split(5)
+        run_deferred()
+        # splitting off a piece doesn't merge anything back together
+        self.assertEqual((part.quantity, self.stack.quantity), (5, 25))
+        # a reserved piece, e.g. one waiting to be sold, doesn't merge with new arrivals
+        part.ndb.reserved = True
+        more = create.object(
+            "typeclasses.objects.StackableObject",
+            key="apple",
+            location=self.room1,
+            attributes=[("quantity", 3)],
+        )
+        more.move_to(self.char1, quiet=True)
+        run_deferred()
+        self.assertEqual(part.quantity, 5)
+        self.assertEqual(sorted(obj.quantity for obj in self.char1.contents), [5, 28])
+
+    def test_stacked_search(self):
+        found = self.char1.search("apple", stacked=12)
+        self.assertEqual(found, [self.stack])
+        self.assertEqual(found[0].get_numbered_name(1, self.char1)[0], "twelve apples")
+        # nothing is split off until the items are moved
+        self.assertEqual(self.stack.quantity, 30)
+        self.assertTrue(self.stack.move_to(self.char1, quiet=True))
+        self.assertEqual(self.stack.quantity, 12)
+        self.assertEqual(self.char1.search("apple", location=self.room1).quantity, 18)
+
+    def test_stacked_search_several_stacks(self):
+        carried = create.object(
+            "typeclasses.objects.StackableObject",
+            key="apple",
+            location=self.char1,
+            attributes=[("quantity", 4)],
+        )
+        for obj in self.char1.search("apple", stacked=6):
+            obj.move_to(self.char2, quiet=True)
+        # the items come from each stack in turn
+        self.assertEqual(sum(obj.quantity for obj in self.char2.contents), 6)
+        left = self.char1.search("apple", stacked=50)
+        self.assertEqual(sum(obj.quantity for obj in left), 28)
+        # asking for more than there is gets everything
+        found = self.char2.search("apple", stacked=50, location=self.char2)
+        self.assertEqual(sum(obj.quantity for obj in found), 6)
+
+    def test_failed_give(self):
+        self.stack.location = self.char1
+        self.char1.execute_cmd("give 5 apples = nobody")
+        self.char1.execute_cmd("give 5 apples = char1")
+        self.assertEqual(len(self.char1.contents), 1)
+        self.assertEqual(self.stack.quantity, 30)
+        # a move which is refused puts the stack back together
+        self.stack.request(5)
+        self.char2.at_pre_object_receive = MagicMock(return_value=False)
+        self.assertFalse(self.stack.move_to(self.char2, quiet=True))
+        self.assertEqual(self.char1.contents, [self.stack])
+        self.assertEqual(self.stack.quantity, 30)
+
+    def test_eat(self):
+        self.char1.execute_cmd("eat apple")
+        self.assertEqual(self.stack.quantity, 29)
+        self.assertEqual(len(self.room1.contents_get(content_type="object")), 3)
+
+    def test_wielded_stack(self):
+        self.stack.location = self.char1
+        self.char1.hands.reset(("left hand", "right hand"))
+        self.char1.at_wield(self.stack)
+        more = create.object(
+            "typeclasses.objects.StackableObject",
+            key="apple",
+            location=self.char1,
+            attributes=[("quantity", 3)],
+        )
+        # the held stack isn't merged away
+        more.restack()
+        self.assertEqual((more.quantity, self.stack.quantity), (3, 30))
+        self.stack.restack()
+        self.assertEqual(self.stack.quantity, 33)
+        self.assertEqual(self.char1.wielding, [self.stack])
+        # eating the last of it empties the hand
+        self.stack.consume(33)
+        self.assertEqual(
+            self.char1.hands.slots, {"left hand": None, "right hand": None}
+        )
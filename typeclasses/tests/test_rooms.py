@@ -0,0 +1,140 @@
+"""
+Tests for custom room logic
+"""
+
+from unittest.mock import patch
+
+from evennia.utils import create
+from evennia.utils.test_resources import EvenniaTest
+
+from commands.shops import CmdSell
+from typeclasses.rooms import XYGridShop
+
+
+class TestXYGridShop(EvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.shop, _ = XYGridShop.create("shop", xyz=(0, 0, "testmap"))
+        self.sword = create.object(key="iron sword", attributes=[("value", 30)])
+        self.arrows = create.object(
+            "typeclasses.objects.StackableObject",
+            key="arrow",
+            attributes=[("value", 1), ("quantity", 12)],
+        )
+
+    def tearDown(self):
+        self.shop.delete()
+        super().tearDown()
+
+    def test_add_take_stock(self):
+        self.shop.add_stock(self.sword)
+        self.shop.add_stock(self.arrows)
+        self.assertEqual(self.sword.location, self.shop.db.storage)
+        self.assertEqual(self.shop.catalogue[(None, "iron sword")]["price"], 60)
+        self.assertEqual(self.shop.catalogue[(None, "arrow")]["count"], 12)
+        self.assertEqual(self.shop.find_stock("arrows"), [(None, "arrow")])
+
+        # quoting a price leaves everything in stock
+        self.assertEqual(
+            self.shop.quote_stock((None, "arrow"), 20), (self.arrows, 12, 24)
+        )
+        self.assertEqual(self.arrows.location, self.shop.db.storage)
+        self.assertEqual(self.arrows.quantity, 12)
+
+        taken = self.shop.take_stock((None, "arrow"), 5)
+        self.assertEqual(taken[0].quantity, 5)
+        self.assertIsNone(taken[0].location)
+        self.assertEqual(self.arrows.quantity, 7)
+        self.assertEqual(self.shop.catalogue[(None, "arrow")]["count"], 7)
+        self.shop.take_stock((None, "iron sword"), 1)
+        self.assertNotIn((None, "iron sword"), self.shop.catalogue)
+
+        # a rebuilt catalogue matches what's in storage
+        self.shop.ndb.catalogue = None
+        self.assertEqual(self.shop.catalogue[(None, "arrow")]["count"], 7)
+        # putting things back merges them into the stock
+        self.shop.add_stock(taken[0])
+        self.assertEqual(self.shop.catalogue[(None, "arrow")]["count"], 12)
+
+    def test_mixed_prices(self):
+        pricey = create.object(key="iron sword", attributes=[("value", 40)])
+        self.shop.add_stock(pricey)
+        self.shop.add_stock(self.sword)
+        key = (None, "iron sword")
+        # the cheapest are quoted and taken first, at their own prices
+        self.assertEqual(self.shop.catalogue[key]["price"], 60)
+        self.assertEqual(self.shop.quote_stock(key, 1), (self.sword, 1, 60))
+        self.assertEqual(self.shop.quote_stock(key, 2)[1:], (2, 140))
+        # something that leaves storage some other way isn't for sale anymore
+        self.sword.location = self.room1
+        self.assertEqual(self.shop.quote_stock(key, 2), (pricey, 1, 80))
+        self.assertEqual(self.shop.catalogue[key]["price"], 80)
+        self.assertEqual(self.shop.take_stock(key, 2), [pricey])
+        self.assertNotIn(key, self.shop.catalogue)
+
+    def test_sell_abandoned(self):
+        for quantity in (5, 3):
+            create.object(
+                "typeclasses.objects.StackableObject",
+                key="apple",
+                location=self.char1,
+                attributes=[("value", 1), ("quantity", quantity)],
+            )
+        cmd = CmdSell()
+        cmd.caller, cmd.obj, cmd.args = self.char1, self.shop, "8 apple"
+        cmd.parse()
+        sale = cmd.func()
+        # the whole amount is named, however it's stacked
+        self.assertIn("sell eight apples for 8 coins", next(sale))
+        # walking away from the question puts everything back together
+        sale.close()
+        self.assertEqual([obj.quantity for obj in self.char1.contents], [8])
+        self.assertIsNone(self.char1.contents[0].ndb.reserved)
+
+    def test_get_listing(self):
+        self.assertEqual(self.shop.get_listing(), "")
+        self.shop.add_stock(self.arrows)
+        listing = self.shop.get_listing()
+        self.assertIn("arrow", listing)
+        self.assertIs(self.shop.get_listing(), listing)
+
+
+class TestRoomListeners(EvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.npc = create.object(
+            "typeclasses.characters.NPC",
+            key="wolf",
+            location=self.room1,
+            attributes=[("react_as", "aggressive")],
+        )
+
+    @patch("typeclasses.characters.GLOBAL_SCRIPTS")
+    def test_listeners(self, mock_scripts):
+        self.assertIn(self.npc, self.room1.listeners)
+        self.assertNotIn(self.char1, self.room1.listeners)
+        self.char2.move_to(self.room2)
+        self.char2.move_to(self.room1)
+        mock_scripts.npc_ai.add_reaction.assert_called_with(
+            self.npc, "aggro", self.char2
+        )
+        # calming down unsubscribes the NPC
+        self.npc.react_as = "timid"
+        self.assertNotIn(self.npc, self.room1.listeners)
+        self.npc.following = self.char1
+        self.assertIn(self.npc, self.room1.listeners)
+        self.npc.move_to(self.room2)
+        self.assertNotIn(self.npc, self.room1.listeners)
+
+
+class TestRoomFooter(EvenniaTest):
+    def test_footer_cache(self):
+        from commands.skills import TrainCmdSet
+
+        self.assertEqual(self.room1.get_display_footer(self.char1), "")
+        self.room1.cmdset.add(TrainCmdSet)
+        self.assertIn(
+            "Special commands here:", self.room1.get_display_footer(self.char1)
+        )
+        self.room1.cmdset.remove(TrainCmdSet)
+        self.assertEqual(self.room1.get_display_footer(self.char1), "")
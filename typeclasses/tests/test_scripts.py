@@ -0,0 +1,179 @@
+"""
+Tests for custom script logic
+"""
+
+from unittest.mock import MagicMock, patch
+from evennia import GLOBAL_SCRIPTS
+from evennia.utils import create
+from evennia.utils.test_resources import EvenniaTest
+
+from typeclasses.scripts import get_or_create_combat_script
+
+
+class TestSpawnCounterScript(EvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.counter = GLOBAL_SCRIPTS.spawn_counter
+
+    def test_recount(self):
+        node = create.object(
+            "typeclasses.objects.GatherNode",
+            key="bush",
+            tags=[("forest", "resource_node")],
+        )
+        self.counter.recount()
+        self.assertEqual(self.counter.get_count("forest", "resource_node"), 1)
+        self.assertEqual(self.counter.get_count("forest", "mob"), 0)
+        node.delete()
+        self.assertEqual(self.counter.get_count("forest", "resource_node"), 0)
+
+    def test_add_release(self):
+        self.counter.recount()
+        self.counter.add("grass", "mob", 2)
+        self.assertEqual(self.counter.counts[("grass", "mob")], 2)
+        self.obj1.tags.add("grass", category="mob")
+        self.counter.release(self.obj1)
+        self.assertEqual(self.counter.get_count("grass", "mob"), 1)
+
+
+class TestCombatScript(EvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.combat = get_or_create_combat_script(self.room1)
+        self.combat.add_combatant(self.char1, enemy=self.char2)
+        self.char1.attack = MagicMock()
+        self.char2.attack = MagicMock()
+
+    def tearDown(self):
+        if self.combat.pk:
+            self.combat.delete()
+        super().tearDown()
+
+    def test_schedule(self):
+        self.combat.schedule(self.char1, self.obj1, 0)
+        self.combat.schedule(self.char2, self.obj2, 60)
+        self.combat.at_repeat()
+        self.char1.attack.assert_called_once_with(None, self.obj1)
+        self.char2.attack.assert_not_called()
+
+    def test_reschedule_unschedule(self):
+        self.combat.schedule(self.char1, self.obj1, 0)
+        self.combat.schedule(self.char1, self.obj2, 0)
+        self.combat.schedule(self.char2, self.obj2, 0)
+        self.combat.unschedule(self.char2)
+        self.combat.at_repeat()
+        self.char1.attack.assert_called_once_with(None, self.obj2)
+        self.char2.attack.assert_not_called()
+
+    def test_failed_action(self):
+        self.char1.attack.side_effect = ValueError("broken")
+        self.combat.schedule(self.char1, self.obj1, 0)
+        self.combat.schedule(self.char2, self.obj2, 0)
+        with patch("typeclasses.scripts.logger") as logger:
+            self.combat.at_repeat()
+        logger.log_trace.assert_called_once()
+        # the rest of the tick still ran, and the one that failed is still in the fight
+        self.char2.attack.assert_called_once_with(None, self.obj2)
+        self.assertIn(self.char1, self.combat.ndb.scheduled)
+
+    def test_trait_buffer(self):
+        self.assertIn("hp", self.char1.traits.buffered)
+        self.char1.traits.hp.current = 60
+        self.combat.remove_combatant(self.char2)
+        # the fight is over, so everyone's traits are saved and no longer buffered
+        self.assertFalse(self.combat.pk)
+        self.assertFalse(self.char1.traits.buffered)
+        saved = self.char1.attributes.get("traits", category="traits")
+        self.assertEqual(saved["hp"]["current"], 60)
+
+    def test_reload_checkpoint(self):
+        self.combat.schedule(self.char1, self.obj1, 0)
+        self.combat.at_server_reload()
+        self.combat.ndb.queue = None
+        self.combat.at_repeat()
+        self.char1.attack.assert_called_once_with(None, self.obj1)
+        self.assertFalse(self.combat.attributes.has("queue"))
+
+    def test_shutdown_checkpoint(self):
+        self.combat.schedule(self.char1, self.obj1, 0)
+        self.combat.at_server_shutdown()
+        self.combat.ndb.queue = None
+        self.combat.at_repeat()
+        self.char1.attack.assert_called_once_with(None, self.obj1)
+
+    def test_state(self):
+        self.assertEqual(self.combat.get_team(self.char1), 0)
+        self.assertEqual(self.combat.get_team(self.char2), 1)
+        self.assertIn(self.char1, self.combat.db.teams[0])
+        # simulate a reload
+        del self.char1.ndb.combat
+        self.combat.ndb.state = None
+        self.combat.at_init()
+        self.assertTrue(self.char1.in_combat)
+        # removing one side ends the fight
+        self.combat.remove_combatant(self.char1)
+        self.assertFalse(self.char1.in_combat)
+        self.assertFalse(self.char2.in_combat)
+        self.assertFalse(self.combat.pk)
+
+    def test_defeated(self):
+        self.combat.set_defeated(self.char2)
+        self.assertEqual(self.combat.active, [self.char1])
+        self.combat.set_defeated(self.char2, False)
+        self.combat.check_victory()
+        self.assertTrue(self.combat.pk)
+        self.combat.set_defeated(self.char2)
+        self.combat.check_victory()
+        self.assertFalse(self.combat.pk)
+
+
+class TestBehaviorScript(EvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.ai = GLOBAL_SCRIPTS.npc_ai
+        self.ai.ndb.queue = None
+        self.npc = create.object(
+            "typeclasses.characters.NPC", key="dog", location=self.room1
+        )
+
+    def test_follow(self):
+        self.npc.following = self.char1
+        self.char1.move_to(self.room2)
+        # nothing happens until the tick
+        self.assertEqual(self.npc.location, self.room1)
+        self.ai.at_repeat()
+        self.assertEqual(self.npc.location, self.room2)
+        self.assertEqual(self.ai.ndb.report["processed"], 1)
+        self.assertEqual(self.ai.ndb.report["pending"], 0)
+
+    def test_follow_locked(self):
+        self.exit.locks.add("traverse:false()")
+        self.exit.at_failed_traverse = MagicMock()
+        self.npc.following = self.char1
+        self.char1.move_to(self.room2)
+        self.ai.at_repeat()
+        self.assertEqual(self.npc.location, self.room1)
+        self.exit.at_failed_traverse.assert_called_once_with(self.npc)
+
+    @patch("typeclasses.characters.randint", return_value=0)
+    def test_timid_flee(self, mock_randint):
+        self.npc.react_as = "timid"
+        self.exit.locks.add("traverse:false()")
+        self.exit.at_failed_traverse = MagicMock()
+        self.npc.at_damage(self.char1, 1)
+        self.ai.at_repeat()
+        # timid NPCs can't get past locked exits either
+        self.assertEqual(self.npc.location, self.room1)
+        self.exit.at_failed_traverse.assert_called_once_with(self.npc)
+        self.exit.locks.add("traverse:true()")
+        self.npc.at_damage(self.char1, 1)
+        self.ai.at_repeat()
+        self.assertEqual(self.npc.location, self.room2)
+
+    def test_stale_reaction(self):
+        self.npc.enter_combat = MagicMock()
+        self.ai.add_reaction(self.npc, "aggro", self.char1)
+        # the target left before the NPC could react
+        self.char1.location = self.room2
+        self.ai.at_repeat()
+        self.npc.enter_combat.assert_not_called()
@@ -6,8 +6,8 @@ https://github.com/evennia/evennia/blob/main/evennia/contrib/rpg/character_creat
 import inflect
 from random import choice
 from typeclasses.characters import Character
+from world.spawning import bulk_spawn
 
-from evennia.prototypes.spawner import spawn
 from evennia.utils import dedent
 from evennia.utils.evtable import EvTable
 
@@ -141,7 +141,7 @@ def _change_stat(caller, raw_string, stat, change, points, **kwargs):
     # verify we have enough points available
     if points >= change:
         # make the change to the trait
-        caller.new_char.attributes.add(stat, stat_value + change)
+        setattr(caller.new_char, stat, stat_value + change)
         # make the inverse change to the points
         points -= change
 
@@ -377,9 +377,8 @@ def menunode_end(caller, raw_string):
     char = caller.new_char
     # since everything is finished and confirmed, we actually create the starting objects now
     protos = ["wool_leggings", "wool_tunic", "leather_boots"]
-    objs = spawn(*protos)
+    objs = bulk_spawn(*[(proto, 1, char) for proto in protos]).objects
     for obj in objs:
-        obj.location = char
         obj.wear(char, True, quiet=True)
     # get start location
     if plaza := char.search("East half of a plaza", global_search=True, quiet=True):
@@ -40,6 +40,12 @@ MAP_STR = '''
 weight = 1
 _MAX_NODES = 50
 _MAX_MOBS = 50
+# the minimap is centered in a box this many characters wide
+_MINIMAP_WIDTH = 29
+# how many rendered minimaps to keep around
+_MINIMAP_CACHE_SIZE = 4096
+# the name of the wilderness script for this map
+WILDERNESS_NAME = "overworld"
 
 
 MAP_KEY = {
@@ -86,12 +92,169 @@ MAP_KEY = {
     },
 }
 
-from random import randint, choices
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import accumulate
+from random import randint, choice, choices
 from evennia.contrib.grid.wilderness import wilderness
 from evennia.prototypes import spawner
-from evennia.utils.search import search_tag
+from evennia.prototypes import prototypes as protlib
+from evennia.prototypes.prototypes import PROTOTYPE_TAG_CATEGORY
+from evennia.utils.containers import GLOBAL_SCRIPTS
 from evennia.utils import logger, pad
 
+from world.spawning import bulk_spawn
+
+
+class TerrainGrid:
+    """
+    A pre-parsed version of a map string, so that coordinate lookups don't have to
+    re-split the whole map every time.
+
+    Each distinct map symbol is given a small integer id, and the map itself is stored
+    as a flat bytearray of those ids. Id 0 is reserved for "off the map".
+    """
+
+    def __init__(self, map_str, map_key):
+        # split the map into lines, i.e. rows
+        # and reverse the order, since the wilderness contrib considers row 0 to be the bottom
+        rows = map_str.split("\n")
+        rows.reverse()
+        self.height = len(rows)
+        self.width = max(len(row) for row in rows)
+
+        # the lookup tables for each tile id - the map symbol and its MAP_KEY data
+        self.symbols = [" "]
+        self.tiles = [None]
+        ids = {}
+        self.grid = bytearray(self.width * self.height)
+        for y, row in enumerate(rows):
+            offset = y * self.width
+            for x, symbol in enumerate(row):
+                if (tile_id := ids.get(symbol)) is None:
+                    tile_id = ids[symbol] = len(self.symbols)
+                    self.symbols.append(symbol)
+                    self.tiles.append(map_key.get(symbol))
+                self.grid[offset + x] = tile_id
+
+    def get_tile_id(self, x, y):
+        """Returns the tile id at x, y, or 0 if it's off the map"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.grid[y * self.width + x]
+        return 0
+
+    def get_tile(self, coordinates):
+        """Returns the map key data for the given coordinates, or None if it isn't a valid tile"""
+        return self.tiles[self.get_tile_id(*coordinates)]
+
+    def get_coordinates(self, biome):
+        """Returns a list of the coordinates of every tile in the given biome"""
+        tile_ids = {
+            tile_id
+            for tile_id, tile_data in enumerate(self.tiles)
+            if tile_data and tile_data.get("biome") == biome
+        }
+        width = self.width
+        return [
+            (i % width, i // width)
+            for i, tile_id in enumerate(self.grid)
+            if tile_id in tile_ids
+        ]
+
+    def get_rows(self, coordinates, radius):
+        """
+        Returns the map symbols within `radius` of the coordinates, as a list of strings
+        from top to bottom.
+        """
+        x, y = coordinates
+        symbols = self.symbols
+        return [
+            "".join(
+                symbols[self.get_tile_id(i, j)]
+                for i in range(x - radius, x + radius + 1)
+            )
+            for j in range(y + radius, y - radius - 1, -1)
+        ]
+
+
+# parse the map once, when the module is loaded
+TERRAIN = TerrainGrid(MAP_STR, MAP_KEY)
+
+
+class SpawnTable:
+    """
+    A weighted table of prototype keys to spawn from, with the cumulative weights worked out
+    ahead of time so picking from it doesn't have to rebuild anything.
+    """
+
+    __slots__ = ("options", "cum_weights")
+
+    def __init__(self, weighted_options):
+        self.options, weights = zip(*weighted_options)
+        self.cum_weights = list(accumulate(weights))
+
+    def choice(self):
+        """Pick a single prototype key"""
+        return choices(self.options, cum_weights=self.cum_weights)[0]
+
+    def sample(self, count):
+        """Pick `count` prototype keys at once, e.g. for seeding a whole biome"""
+        return choices(self.options, cum_weights=self.cum_weights, k=count)
+
+
+def build_spawn_tables(map_key):
+    """
+    Build the spawn tables for every biome in a map key.
+
+    Returns:
+        tables (dict): maps (biome, "gathers" or "mobs") to a SpawnTable
+    """
+    tables = {}
+    for tile_data in map_key.values():
+        for field in ("gathers", "mobs"):
+            if weighted_options := tile_data.get(field):
+                tables[(tile_data["biome"], field)] = SpawnTable(weighted_options)
+    return tables
+
+
+SPAWN_TABLES = build_spawn_tables(MAP_KEY)
+
+
+def reload_spawn_tables(map_key=None):
+    """
+    Rebuild the spawn tables in place, e.g. after the map key data has changed.
+    """
+    SPAWN_TABLES.clear()
+    SPAWN_TABLES.update(build_spawn_tables(map_key or MAP_KEY))
+
+
+@lru_cache(maxsize=_MINIMAP_CACHE_SIZE)
+def get_minimap(coordinates, radius=2):
+    """
+    Render the minimap centered on the given coordinates.
+
+    The map never changes while the server is running, so the rendered strings are
+    cached and shared between every room that displays the same coordinates.
+
+    Args:
+        coordinates (tuple): the (x, y) coordinates at the center of the minimap
+        radius (int): how many tiles to show in each direction from the center
+
+    Returns:
+        minimap (str): the rendered minimap, including borders
+    """
+    width = max(_MINIMAP_WIDTH, radius * 2 + 1)
+    border = "-" * width
+    padding = " " * ((width - (radius * 2 + 1)) // 2)
+    minimap = [border]
+    for i, row in enumerate(TERRAIN.get_rows(coordinates, radius)):
+        if i == radius:
+            # mark our location
+            row = row[:radius] + "|g@|n" + row[radius + 1 :]
+        minimap.append(padding + row + padding)
+    minimap.append(border)
+    return "\n".join(minimap)
+
 
 class OverworldMapProvider(wilderness.WildernessMapProvider):
     room_typeclass = "typeclasses.rooms.OverworldRoom"
@@ -99,65 +262,33 @@ class OverworldMapProvider(wilderness.WildernessMapProvider):
 
     def is_valid_coordinates(self, wilderness, coordinates):
         "Validates if these coordinates are inside the map"
-        x, y = coordinates
-        # split the map into lines, i.e. rows
-        # and reverse the order, since the wilderness contrib considers row 0 to be the bottom
-        rows = MAP_STR.split("\n")
-        rows.reverse()
-        # make sure that y is a valid coordinate
-        if y not in range(len(rows)):
-            return False
-        # get the y-coord row
-        row = rows[y]
-        # validate x as well
-        if x not in range(len(row)):
-            return False
-        # get the specific tile
-        tile = row[x]
         # if it's a key in the map key dict, it's good
-        return tile in MAP_KEY
+        return TERRAIN.get_tile(coordinates) is not None
 
     def get_location_name(self, coordinates):
         """Returns the name for the given coordinate"""
-        x, y = coordinates
-
-        # we've already passed coord validation so we can just grab the data
-        rows = MAP_STR.split("\n")
-        rows.reverse()
-        tile = rows[y][x]
-        tile_data = MAP_KEY.get(tile, {})
+        tile_data = TERRAIN.get_tile(coordinates) or {}
         return f"In the {tile_data.get('biome', 'wilderness')}"
 
     def at_prepare_room(self, coordinates, caller, room):
         """Any changes that need to be done to the room after 'moving'."""
-        x, y = coordinates
-
-        # we've already passed coord validation so we can just grab the data
-        rows = MAP_STR.split("\n")
-        rows.reverse()
-        tile = rows[y][x]
-        tile_data = MAP_KEY.get(tile, {})
+        tile_data = TERRAIN.get_tile(coordinates) or {}
         room.ndb.active_desc = tile_data.get("desc")
-        # build the minimap
-        border = "-" * 29
-        minimap = [border]
-        for i in range(y + 2, y - 3, -1):
-            row = rows[i][x - 2 : x + 3]
-            if i == y:
-                # mark our location
-                row = row[:2] + "|g@|n" + row[3:]
-            minimap.append(" " * 12 + row + " " * 12)
-        minimap.append(border)
-        room.ndb.minimap = "\n".join(minimap)
+        # the room's contents were swapped out without any move hooks
+        room.ndb.listeners = None
+
+        # bring back any mobs that were left here
+        if biome := tile_data.get("biome"):
+            self.wake_mobs(room, coordinates, biome)
 
         if not randint(0, 5):
             # try to generate a resource
             self.spawn_resource(
                 room,
                 coordinates,
-                tile_data.get("gathers"),
+                SPAWN_TABLES.get((biome, "gathers")),
                 cap=tile_data.get("node cap", _MAX_NODES),
-                tag=tile_data.get("biome"),
+                tag=biome,
                 tag_cat="resource_node",
             )
 
@@ -166,58 +297,170 @@ class OverworldMapProvider(wilderness.WildernessMapProvider):
             mob = self.spawn_resource(
                 room,
                 coordinates,
-                tile_data.get("mobs"),
+                SPAWN_TABLES.get((biome, "mobs")),
                 cap=tile_data.get("mob cap", _MAX_MOBS),
-                tag=tile_data.get("biome"),
+                tag=biome,
                 tag_cat="mob",
             )
             if mob:
                 mob.at_character_arrive(caller)
 
-    def spawn_resource(self, room, coordinates, weighted_options, **kwargs):
+    def spawn_resource(self, room, coordinates, spawn_table, **kwargs):
         """
-        Create a new randomized object, if it hasn't reached the cap for this biome.
+        Create a new randomized object from a SpawnTable, if it hasn't reached the cap for
+        this biome.
         """
-        if not weighted_options:
+        if not spawn_table:
             # there's nothing for us to spawn!
             return
 
-        if (tag := kwargs.get("tag")) and (tag_cat := kwargs.get("tag_cat")):
+        tag = kwargs.get("tag")
+        tag_cat = kwargs.get("tag_cat")
+        if tag and tag_cat:
             # we have a tag specified; check for a spawn cap amt
             if spawn_cap := kwargs.get("cap"):
                 # there's a cap! make sure we don't already have enough
-                tagged = search_tag(key=tag, category=tag_cat)
-                if len(tagged) >= spawn_cap:
+                if GLOBAL_SCRIPTS.spawn_counter.get_count(tag, tag_cat) >= spawn_cap:
                     # too many, don't spawn anything new
                     return
         # we're good to keep going
-        # split the weighted options into a list of materials and the corresponding list of weights
-        options, weights = zip(*weighted_options)
-        protkey = choices(options, weights=weights)[0]
-        # spawn the new object and put it in the room
+        protkey = spawn_table.choice()
+        return self.spawn_at(room, coordinates, protkey, tag=tag, tag_cat=tag_cat)
+
+    def spawn_at(self, room, coordinates, protkey, tag=None, tag_cat=None):
+        """
+        Spawn an object from a prototype at the given coordinates, tagging it with its biome.
+        """
         try:
             obj = spawner.spawn(protkey)[0]
         except KeyError as e:
             logger.log_msg(f"   {e} on {protkey}")
             return
         room.wilderness.move_obj(obj, coordinates)
+        # that didn't run any move hooks, so the room has to pick up a new listener itself
+        if location := obj.location:
+            location.ndb.listeners = None
         if tag and tag_cat:
             obj.tags.add(tag, category=tag_cat)
+            GLOBAL_SCRIPTS.spawn_counter.add(tag, tag_cat)
 
         return obj
 
+    def wake_mobs(self, room, coordinates, biome):
+        """
+        Spawn the dormant mobs at these coordinates back into real objects.
+        """
+        for protkey in GLOBAL_SCRIPTS.spawn_counter.wake(biome, coordinates):
+            self.spawn_at(room, coordinates, protkey, tag=biome, tag_cat="mob")
+
+    def fold_mobs(self, room):
+        """
+        Turn the mobs in a room into dormant prototype keys, deleting their objects.
+
+        Mobs which are busy fighting are left alone.
+        """
+        coordinates = room.coordinates
+        itemcoordinates = room.wilderness.db.itemcoordinates
+        folded = {}
+        for obj in room.contents_get(content_type="character"):
+            if obj.has_account or obj.in_combat:
+                continue
+            if not (biome := obj.tags.get(category="mob")):
+                continue
+            if not (protkey := obj.tags.get(category=PROTOTYPE_TAG_CATEGORY)):
+                continue
+            itemcoordinates.pop(obj, None)
+            # deleting the mob releases it from the spawn count; folding adds it back
+            obj.delete()
+            folded.setdefault(biome, []).append(protkey)
+
+        for biome, protkeys in folded.items():
+            GLOBAL_SCRIPTS.spawn_counter.fold(biome, coordinates, protkeys)
+
 
 def create():
     """
     Create the wilderness script for this map, if it doesn't already exist.
     """
     wilderness.create_wilderness(
-        mapprovider=OverworldMapProvider(), name="overworld", preserve_items=True
+        mapprovider=OverworldMapProvider(), name=WILDERNESS_NAME, preserve_items=True
     )
 
 
+def seed():
+    """
+    Fill up every biome in the overworld to its resource node and mob caps, e.g. after
+    a server wipe, so that spawning on the fly only has to keep things topped up.
+
+    Resource nodes are created all at once and placed at random coordinates in their
+    biome, while mobs are added as dormant until someone goes to their coordinates.
+    Coordinates which currently have a room are skipped.
+
+    Returns:
+        seeded (Counter): how many of each (biome, category) were added
+    """
+    create()
+    wilderness_script = wilderness.WildernessScript.objects.get(db_key=WILDERNESS_NAME)
+    counter = GLOBAL_SCRIPTS.spawn_counter
+    active = set(wilderness_script.db.rooms.keys())
+    seeded = Counter()
+    requests = []
+    placements = []
+
+    for tile_data in MAP_KEY.values():
+        biome = tile_data["biome"]
+        if not (
+            coordinates := [
+                coords
+                for coords in TERRAIN.get_coordinates(biome)
+                if coords not in active
+            ]
+        ):
+            continue
+
+        # resource nodes are spawned as real objects
+        if table := SPAWN_TABLES.get((biome, "gathers")):
+            cap = tile_data.get("node cap", _MAX_NODES)
+            if (needed := cap - counter.get_count(biome, "resource_node")) > 0:
+                for protkey, count in Counter(table.sample(needed)).items():
+                    (prototype,) = protlib.search_prototype(
+                        protkey, require_single=True
+                    )
+                    prototype = dict(
+                        prototype,
+                        tags=list(prototype.get("tags", []))
+                        + [(biome, "resource_node", None)],
+                    )
+                    requests.append((prototype, count, None))
+                    placements.extend(choices(coordinates, k=count))
+                counter.add(biome, "resource_node", needed)
+                seeded[(biome, "resource_node")] += needed
+
+        # mobs are left dormant until someone goes to find them
+        if table := SPAWN_TABLES.get((biome, "mobs")):
+            cap = tile_data.get("mob cap", _MAX_MOBS)
+            if (needed := cap - counter.get_count(biome, "mob")) > 0:
+                dormant = defaultdict(list)
+                for protkey in table.sample(needed):
+                    dormant[choice(coordinates)].append(protkey.lower())
+                for coords, protkeys in dormant.items():
+                    counter.fold(biome, coords, protkeys)
+                seeded[(biome, "mob")] += needed
+
+    if requests:
+        report = bulk_spawn(*requests)
+        # record all of the new objects' coordinates in a single save
+        itemcoordinates = wilderness_script.db.itemcoordinates.deserialize()
+        for obj, coords in zip(report.objects, placements):
+            itemcoordinates[obj] = coords
+            obj.ndb.wilderness = wilderness_script
+        wilderness_script.db.itemcoordinates = itemcoordinates
+
+    return seeded
+
+
 def enter(obj, coordinates):
     """
     Move obj into the overworld map at coordinates x, y
     """
-    wilderness.enter_wilderness(obj, coordinates=coordinates, name="overworld")
+    wilderness.enter_wilderness(obj, coordinates=coordinates, name=WILDERNESS_NAME)
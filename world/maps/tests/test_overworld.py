@@ -0,0 +1,243 @@
+"""
+Tests for the overworld map provider
+
+"""
+
+from unittest import TestCase
+from unittest.mock import PropertyMock, patch
+from evennia import GLOBAL_SCRIPTS
+from evennia.utils import create
+from evennia.utils.test_resources import EvenniaTest
+from evennia.contrib.grid.wilderness import wilderness
+
+from world.maps import overworld
+
+_TEST_MAP = """
+~~~~~
+~.%.~
+~%O%~
+~~~
+"""
+
+
+class TestTerrainGrid(TestCase):
+    def setUp(self):
+        self.grid = overworld.TerrainGrid(_TEST_MAP, overworld.MAP_KEY)
+
+    def test_get_tile(self):
+        # row 0 is the bottom of the map
+        self.assertIsNone(self.grid.get_tile((1, 1)))
+        self.assertEqual(self.grid.get_tile((2, 2))["biome"], "city")
+        self.assertEqual(self.grid.get_tile((1, 3))["biome"], "beach")
+        # off the edges of the map
+        self.assertIsNone(self.grid.get_tile((-1, 2)))
+        self.assertIsNone(self.grid.get_tile((5, 2)))
+        self.assertIsNone(self.grid.get_tile((3, 7)))
+
+    def test_get_rows(self):
+        self.assertEqual(self.grid.get_rows((2, 2), 1), [".%.", "%O%", "~~ "])
+
+
+class TestSpawnTables(TestCase):
+    def test_build_spawn_tables(self):
+        table = overworld.SPAWN_TABLES[("grass", "mobs")]
+        self.assertEqual(table.options, ("DOE_DEER", "STAG_DEER", "PHEASANT"))
+        self.assertEqual(table.cum_weights, [3, 4, 14])
+        # biomes without anything to spawn don't get a table
+        self.assertNotIn(("city", "mobs"), overworld.SPAWN_TABLES)
+
+    def test_sample(self):
+        table = overworld.SpawnTable((("ROCK", 1), ("NOTHING", 0)))
+        self.assertEqual(table.sample(50), ["ROCK"] * 50)
+        self.assertEqual(table.choice(), "ROCK")
+
+    def test_reload_spawn_tables(self):
+        tables = overworld.SPAWN_TABLES
+        overworld.reload_spawn_tables({"x": {"biome": "void", "mobs": (("GHOST", 1),)}})
+        self.assertIs(overworld.SPAWN_TABLES, tables)
+        self.assertEqual(list(tables), [("void", "mobs")])
+        overworld.reload_spawn_tables()
+        self.assertIn(("grass", "mobs"), tables)
+
+
+class TestOverworldMapProvider(TestCase):
+    def setUp(self):
+        self.provider = overworld.OverworldMapProvider()
+
+    def test_is_valid_coordinates(self):
+        self.assertTrue(self.provider.is_valid_coordinates(None, (50, 20)))
+        self.assertFalse(self.provider.is_valid_coordinates(None, (0, 0)))
+        self.assertFalse(self.provider.is_valid_coordinates(None, (-1, 20)))
+        self.assertFalse(self.provider.is_valid_coordinates(None, (500, 20)))
+
+    def test_get_location_name(self):
+        self.assertEqual(self.provider.get_location_name((50, 20)), "In the city")
+
+    def test_get_minimap(self):
+        minimap = overworld.get_minimap((50, 20))
+        lines = minimap.split("\n")
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(lines[0], "-" * 29)
+        self.assertEqual(lines[3], " " * 12 + '""|g@|n""' + " " * 12)
+        # the same coordinates reuse the rendered string
+        self.assertIs(overworld.get_minimap((50, 20)), minimap)
+        # larger radii are rendered from the same grid
+        self.assertEqual(len(overworld.get_minimap((50, 20), 4).split("\n")), 11)
+
+
+class TestDormantMobs(EvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.counter = GLOBAL_SCRIPTS.spawn_counter
+        self.counter.ndb.dormant = None
+        self.counter.recount()
+        overworld.create()
+        self.coordinates = next(
+            (x, y)
+            for y in range(overworld.TERRAIN.height)
+            for x in range(overworld.TERRAIN.width)
+            if (overworld.TERRAIN.get_tile((x, y)) or {}).get("biome") == "forest"
+        )
+        # don't randomly spawn anything
+        with patch("world.maps.overworld.randint", return_value=1):
+            overworld.enter(self.char1, self.coordinates)
+        self.room = self.char1.location
+        self.provider = self.room.wilderness.mapprovider
+
+    def test_fold_wake(self):
+        mob = self.provider.spawn_at(
+            self.room, self.coordinates, "DOE_DEER", tag="forest", tag_cat="mob"
+        )
+        self.assertEqual(self.counter.get_count("forest", "mob"), 1)
+        self.provider.fold_mobs(self.room)
+        self.assertFalse(mob.pk)
+        self.assertEqual(self.counter.dormant["forest"][self.coordinates], ["doe_deer"])
+        # the dormant mob still counts towards the cap
+        self.assertEqual(self.counter.get_count("forest", "mob"), 1)
+        self.provider.wake_mobs(self.room, self.coordinates, "forest")
+        self.assertNotIn(self.coordinates, self.counter.dormant["forest"])
+        self.assertEqual(self.counter.get_count("forest", "mob"), 1)
+        mobs = [
+            obj for obj in self.room.contents if obj.tags.has("forest", category="mob")
+        ]
+        self.assertEqual(len(mobs), 1)
+        self.assertEqual(mobs[0].key, mob.key)
+
+    def _exit_to_valid(self):
+        """Find an exit out of the room that leads somewhere on the map, and its way back"""
+        opposites = {"north": "south", "east": "west", "south": "north", "west": "east"}
+        for key, back in opposites.items():
+            coords = wilderness.get_new_coordinates(self.coordinates, key)
+            if overworld.TERRAIN.get_tile(coords):
+                return self.room.search(key, candidates=self.room.exits), back
+
+    def _as_player(self):
+        """Make the test character count as a player, since only players fold and wake mobs"""
+        return patch.object(
+            type(self.char1),
+            "has_account",
+            new_callable=PropertyMock,
+            return_value=True,
+        )
+
+    def test_blocked_move_keeps_mobs(self):
+        mob = self.provider.spawn_at(
+            self.room, self.coordinates, "DOE_DEER", tag="forest", tag_cat="mob"
+        )
+        exit_obj, _ = self._exit_to_valid()
+        self.char1.tags.add("sitting", category="status")
+        with self._as_player():
+            exit_obj.at_traverse(self.char1, self.room)
+        self.assertEqual(self.char1.location, self.room)
+        self.assertTrue(mob.pk)
+
+    def test_wake_on_return(self):
+        self.provider.spawn_at(
+            self.room, self.coordinates, "DOE_DEER", tag="forest", tag_cat="mob"
+        )
+        rock = create.object(key="rock")
+        self.room.wilderness.move_obj(rock, self.coordinates)
+        exit_obj, back = self._exit_to_valid()
+        with self._as_player(), patch("world.maps.overworld.randint", return_value=1):
+            exit_obj.at_traverse(self.char1, self.room)
+            # the rock keeps the room around, but the mob is folded up
+            self.assertNotEqual(self.char1.location, self.room)
+            self.assertEqual(
+                self.counter.dormant["forest"][self.coordinates], ["doe_deer"]
+            )
+            other = self.char1.location
+            other.search(back, candidates=other.exits).at_traverse(self.char1, other)
+        self.assertEqual(self.char1.location, self.room)
+        self.assertNotIn(self.coordinates, self.counter.dormant.get("forest", {}))
+        self.assertTrue(
+            any(obj.tags.has("forest", category="mob") for obj in self.room.contents)
+        )
+
+    def test_wake_aggressive(self):
+        rock = create.object(key="rock")
+        self.room.wilderness.move_obj(rock, self.coordinates)
+        self.char1.move_to(self.room1)
+        # the room is kept around by the rock, with no one listening in it
+        self.assertEqual(self.room.listeners, set())
+        self.counter.fold("forest", self.coordinates, ["angry_bear"])
+        ai = GLOBAL_SCRIPTS.npc_ai
+        ai.ndb.queue = None
+        with self._as_player():
+            self.char1.move_to(self.room)
+        bear = next(
+            obj for obj in self.room.contents if obj.tags.has("forest", category="mob")
+        )
+        self.assertIn(bear, self.room.listeners)
+        self.assertEqual([entry[:2] for entry in ai.queue], [("aggro", bear)])
+
+    def test_room_reaper(self):
+        rock = create.object(key="rock")
+        self.room.wilderness.move_obj(rock, self.coordinates)
+        self.provider.spawn_at(
+            self.room, self.coordinates, "DOE_DEER", tag="forest", tag_cat="mob"
+        )
+        self.char1.move_to(self.room1)
+        # the rock keeps the room around, since the wilderness preserves items
+        wilderness = self.room.wilderness
+        self.assertIs(wilderness.db.rooms.get(self.coordinates), self.room)
+        reaper = GLOBAL_SCRIPTS.room_reaper
+        reaper.ndb.idle = None
+        with patch("typeclasses.scripts.time", return_value=1000):
+            reaper.at_repeat()
+        self.assertIs(wilderness.db.rooms.get(self.coordinates), self.room)
+        with patch("typeclasses.scripts.time", return_value=2000):
+            reaper.at_repeat()
+        self.assertNotIn(self.coordinates, wilderness.db.rooms)
+        self.assertIn(self.room, wilderness.db.unused_rooms)
+        # the rock is left on the map, and the mob is folded up
+        self.assertIsNone(rock.location)
+        self.assertEqual(wilderness.db.itemcoordinates[rock], self.coordinates)
+        self.assertEqual(self.counter.dormant["forest"][self.coordinates], ["doe_deer"])
+        # and they're all back when someone returns
+        with self._as_player(), patch("world.maps.overworld.randint", return_value=1):
+            overworld.enter(self.char1, self.coordinates)
+        self.assertEqual(rock.location, self.char1.location)
+        self.assertNotIn(self.coordinates, self.counter.dormant.get("forest", {}))
+
+    def test_seed(self):
+        self.char1.move_to(self.room1)
+        seeded = overworld.seed()
+        self.assertEqual(seeded[("forest", "resource_node")], 10)
+        self.assertEqual(seeded[("forest", "mob")], 25)
+        self.assertEqual(self.counter.get_count("forest", "resource_node"), 10)
+        self.assertEqual(
+            sum(len(mobs) for mobs in self.counter.dormant["forest"].values()), 25
+        )
+        itemcoordinates = self.room.wilderness.db.itemcoordinates
+        nodes = [
+            obj for obj in itemcoordinates if obj.tags.has("forest", "resource_node")
+        ]
+        self.assertEqual(len(nodes), 10)
+        self.assertTrue(
+            all(
+                overworld.TERRAIN.get_tile(itemcoordinates[obj])["biome"] == "forest"
+                for obj in nodes
+            )
+        )
+        # everything's at its caps now
+        self.assertFalse(overworld.seed())
@@ -100,6 +100,7 @@ LARGE_BAG = {
 }
 
 PIE_CRUST = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "a pie crust",
     "desc": "A golden brown, but empty, pie crust.",
     "tags": [
@@ -112,6 +113,7 @@ PIE_CRUST = {
 ### Shop Items
 
 PIE_SLICE = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "slice of $choice('apple', 'blueberry', 'peach', 'cherry', 'custard') pie",
     "desc": "A single slice of freshly-baked pie.",
     "tags": [
@@ -177,6 +179,7 @@ IRON_ORE_NODE = {
     "gathers": lambda: randint(2, 10),
 }
 IRON_ORE = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "iron ore",
     "desc": "A clump of raw iron ore.",
     "tags": [("iron ore", "crafting_material")],
@@ -192,6 +195,7 @@ COPPER_ORE_NODE = {
     "gathers": lambda: randint(2, 10),
 }
 COPPER_ORE = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "copper ore",
     "desc": "A clump of raw copper ore.",
     "tags": [("copper ore", "crafting_material")],
@@ -207,6 +211,7 @@ FRUIT_TREE = {
     "gathers": lambda: randint(5, 10),
 }
 APPLE_FRUIT = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "apple",
     "desc": "A delicious multi-colored apple.",
     "tags": [("apple", "crafting_material"), ("fruit", "crafting_material"), "edible"],
@@ -214,6 +219,7 @@ APPLE_FRUIT = {
     "value": 1,
 }
 PEAR_FRUIT = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "pear",
     "desc": "A fragant golden pear.",
     "tags": [("pear", "crafting_material"), ("fruit", "crafting_material"), "edible"],
@@ -221,6 +227,7 @@ PEAR_FRUIT = {
     "value": 1,
 }
 PLUM_FRUIT = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "plum",
     "desc": "A large red-black plum.",
     "tags": [("plum", "crafting_material"), ("fruit", "crafting_material"), "edible"],
@@ -237,6 +244,7 @@ BERRY_BUSH = {
     "gathers": lambda: randint(5, 10),
 }
 BLACKBERRY = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "blackberry",
     "desc": "A juicy blackberry.",
     "tags": [
@@ -249,6 +257,7 @@ BLACKBERRY = {
     "value": 0,
 }
 BLUEBERRY = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "blueberry",
     "desc": "A single blueberry.",
     "tags": [
@@ -261,6 +270,7 @@ BLUEBERRY = {
     "value": 0,
 }
 RASPBERRY = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "raspberry",
     "desc": "A large red raspberry.",
     "tags": [
@@ -282,6 +292,7 @@ LUMBER_TREE = {
     "gathers": lambda: randint(2, 10),
 }
 WOOD_LOG = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "log of wood",
     "desc": "A decent-sized wooden log. Not so big you can't carry it.",
     "tags": [
@@ -299,6 +310,7 @@ DRIFTWOOD = {
     "gathers": lambda: randint(1, 3),
 }
 WOOD_LOG = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "log of wood",
     "desc": "A decent-sized wooden log. Not so big you can't carry it.",
     "tags": [
@@ -415,21 +427,25 @@ STAG_DEER = {
 ### Mob drops
 
 RAW_MEAT = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "raw meat",
     "desc": "A piece of meat from an animal. It hasn't been cooked.",
     "tags": [("raw meat", "crafting_material")],
 }
 ANIMAL_HIDE = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "animal hide",
     "desc": "A section of hide from an animal, suitable for leather-crafting",
     "tags": [("leather", "crafting_material")],
 }
 DEER_MEAT = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "raw deer meat",
     "desc": "A piece of meat from a deer. It hasn't been cooked.",
     "tags": [("raw meat", "crafting_material"), ("venison", "crafting_material")],
 }
 DEER_ANTLER = {
+    "typeclass": "typeclasses.objects.StackableObject",
     "key": "antler",
     "desc": "A forked antler bone from an adult stag.",
     "tags": [
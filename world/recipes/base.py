@@ -1,6 +1,19 @@
+from collections import Counter
+from itertools import groupby
 from random import randint
-from evennia.utils import iter_to_str
+from django.db import transaction
+from evennia.utils import iter_to_str, inherits_from
 from evennia.contrib.game_systems.crafting import CraftingRecipe
+from evennia.contrib.game_systems.crafting.crafting import (
+    CraftingError,
+    CraftingValidationError,
+)
+
+from typeclasses.objects import StackableObject
+from world.spawning import CompiledPrototype, bulk_spawn
+
+# the most times a recipe can be crafted in one go
+MAX_BATCH = 20
 
 
 class SkillRecipe(CraftingRecipe):
@@ -13,47 +26,286 @@ class SkillRecipe(CraftingRecipe):
     # The skill requirement for the recipe.
     skill = (None, 0)
     exp_gain = 0
+    # The output prototypes, compiled once for each recipe, with how many of each to make.
+    compiled_outputs = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # group up repeated outputs, e.g. six slices of pie, so they're spawned together
+        cls.compiled_outputs = []
+        for _, group in groupby(cls.output_prototypes, key=id):
+            group = list(group)
+            cls.compiled_outputs.append((CompiledPrototype(group[0]), len(group)))
 
     def craft(self, **kwargs):
         """The input is ok. Determine if crafting succeeds"""
+        # crafting several at once goes through the batched path
+        count = kwargs.get("count", self.craft_kwargs.get("count", 1))
+        if count > 1:
+            return self.craft_batch(count, **kwargs)
 
-        # this is set at initialization
-        crafter = self.crafter
+        allowed, success_rate = self._check_skill()
+        if not allowed:
+            return
+        # if no requirement is set, just craft
+        if success_rate is None:
+            return super().craft(**kwargs)
+
+        # at this point the crafting attempt is considered happening
+        self._spend_attempts(1)
+        # implement some randomness - the higher the difference, the lower the chance of failure
+        if not randint(0, success_rate):
+            self.msg("It doesn't seem to work out. Maybe you should try again?")
+            return
+
+        # all is good, craft away
+        return super().craft(**kwargs)
+
+    def craft_batch(self, count, raise_exception=False, **kwargs):
+        """
+        Craft the recipe `count` times over, with the same results as crafting it that many
+        times in a row - as long as there's enough of everything for all of them.
+
+        The inputs for every attempt are validated together up front, so a batch that
+        doesn't have everything it needs fails without spending anything. This is unlike
+        crafting one at a time, where each attempt costs focus and gives experience even
+        if its materials turn out to be missing. The successes are then all rolled at
+        once, and the inputs are used up and the outputs created in a single transaction.
+
+        Args:
+            count (int): How many times to craft the recipe, up to `MAX_BATCH`.
+            raise_exception (bool): If True, raise a `CraftingError` on failure.
+
+        Returns:
+            list or None: All of the crafted objects, or None if nothing was made.
+        """
+        if not self.allow_craft:
+            raise CraftingError(
+                "Cannot re-run crafting without re-initializing recipe first."
+            )
+        self.allow_craft = self.allow_reuse
+
+        if count > MAX_BATCH:
+            self.msg(f"You can't craft more than {MAX_BATCH} at once.")
+            if raise_exception:
+                raise CraftingError(f"Crafting of {self.name} failed.")
+            return
+
+        allowed, success_rate = self._check_skill()
+        if not allowed:
+            if raise_exception:
+                raise CraftingError(f"Crafting of {self.name} failed.")
+            return
+
+        craft_kwargs = dict(self.craft_kwargs, **kwargs)
+        per_craft = len(self.consumable_tags)
+        # validate the materials for all of the attempts at once
+        tags, names = self.consumable_tags, self.consumable_names
+        self.consumable_tags, self.consumable_names = tags * count, names * count
+        try:
+            self.pre_craft(**craft_kwargs)
+        except CraftingValidationError:
+            self.post_craft(None, **craft_kwargs)
+            if raise_exception:
+                raise
+            return
+        finally:
+            self.consumable_tags, self.consumable_names = tags, names
+
+        if success_rate is None:
+            successes = count
+        else:
+            self._spend_attempts(count)
+            successes = sum(1 for _ in range(count) if randint(0, success_rate))
+
+        if not successes:
+            # the same as a single failed attempt
+            self.msg("It doesn't seem to work out. Maybe you should try again?")
+            if raise_exception:
+                raise CraftingError(f"Crafting of {self.name} failed.")
+            return
+        if successes < count:
+            self.msg(
+                f"{count - successes} of your {count} attempts don't seem to work out."
+            )
 
+        # failed attempts keep their materials, same as a single failed craft
+        self.validated_consumables = self.validated_consumables[: successes * per_craft]
+
+        with transaction.atomic():
+            result = self.do_craft(**dict(craft_kwargs, count=successes))
+            result = self.post_craft(result, **craft_kwargs)
+
+        if not result and raise_exception:
+            raise CraftingError(f"Crafting of {self.name} failed.")
+        return result
+
+    def _check_skill(self):
+        """
+        Check the crafter's skill against the recipe's requirement, letting them know if
+        they can't make it.
+
+        Returns:
+            tuple: Whether the crafter can attempt the recipe, and their margin over its
+                difficulty - or None if it has no skill requirement.
+        """
         # let's assume the skill is stored directly on the crafter
         # - the skill is 0..100.
         # get our skill requirements
         req_skill, difficulty = self.skill
 
-        # if no requirement is set, just craft
+        # if no requirement is set, anyone can make it
         if not req_skill or not difficulty:
-            return super().craft(**kwargs)
+            return True, None
 
         # otherwise, retrieve the skill from the crafter
-        crafting_skill = crafter.traits.get(req_skill)
+        crafting_skill = self.crafter.get_skill(req_skill)
         # if crafter doesn't have the skill
         if not crafting_skill:
             self.msg("You don't know how to make this.")
-            return
+            return False, None
         # if crafter just isn't good enough
         elif crafting_skill.value < difficulty:
             self.msg(
                 "You are not good enough to make this yet. Better keep practicing!"
             )
-            return
+            return False, None
 
-        success_rate = crafting_skill.value - difficulty
+        return True, crafting_skill.value - difficulty
 
-        # at this point the crafting attempt is considered happening, so subtract mental focus
-        crafter.traits.fp.current -= 5
+    def _spend_attempts(self, count):
+        """
+        Subtract the mental focus and award the experience for some number of attempts.
+        """
+        crafter = self.crafter
+        crafter.traits.fp.current -= 5 * count
         # you should get the experience reward regardless of success
         if self.exp_gain:
             exp = crafter.attributes.get("exp", 0)
-            crafter.db.exp = self.exp_gain + exp
-        # implement some randomness - the higher the difference, the lower the chance of failure
-        if not randint(0, success_rate):
-            self.msg("It doesn't seem to work out. Maybe you should try again?")
-            return
+            crafter.db.exp = self.exp_gain * count + exp
 
-        # all is good, craft away
-        return super().craft(**kwargs)
+    def _match_inputs(self, tagmap, taglist, namelist, exact, missing_msg, excess_msg):
+        """
+        Match up the required tags against the tagged inputs, letting each stack fill
+        in for as many of the requirements as it has items.
+
+        Returns:
+            list: The matching input for each tag in `taglist`, in order.
+        """
+        available = {
+            obj: obj.quantity if isinstance(obj, StackableObject) else 1
+            for obj in tagmap
+        }
+        valids = []
+        for i, tagkey in enumerate(taglist):
+            found = next(
+                (
+                    obj
+                    for obj, tags in tagmap.items()
+                    if tagkey in tags and available[obj]
+                ),
+                None,
+            )
+            if not found:
+                if exact:
+                    err = self._format_message(
+                        missing_msg,
+                        missing=namelist[i] if namelist else tagkey.capitalize(),
+                    )
+                    self.msg(err)
+                    raise CraftingValidationError(err)
+                continue
+            available[found] -= 1
+            valids.append(found)
+
+        if exact and (excess := [obj for obj in tagmap if obj not in valids]):
+            err = self._format_message(
+                excess_msg,
+                excess=[obj.get_display_name(looker=self.crafter) for obj in excess],
+            )
+            self.msg(err)
+            raise CraftingValidationError(err)
+
+        return valids
+
+    def pre_craft(self, **kwargs):
+        """
+        Validate the inputs, counting a stack of materials as one input per item in it.
+
+        e.g. `craft iron ingot from iron ore` can use two iron ore from the same stack
+        """
+        tool_map = {}
+        consumable_map = {}
+        # the same stack may be given more than once, so only look at each input once
+        for obj in dict.fromkeys(self.inputs):
+            if not obj or not inherits_from(obj, "evennia.objects.models.ObjectDB"):
+                continue
+            if tags := obj.tags.get(category=self.tool_tag_category, return_list=True):
+                tool_map[obj] = tags
+            elif tags := obj.tags.get(
+                category=self.consumable_tag_category, return_list=True
+            ):
+                consumable_map[obj] = tags
+
+        # set these for error handling, same as the base recipe
+        self.validated_tools = list(tool_map)
+        self.validated_consumables = []
+
+        tools = self._match_inputs(
+            tool_map,
+            self.tool_tags,
+            self.tool_names,
+            self.exact_tools,
+            self.error_tool_missing_message,
+            self.error_tool_excess_message,
+        )
+        consumables = self._match_inputs(
+            consumable_map,
+            self.consumable_tags,
+            self.consumable_names,
+            self.exact_consumables,
+            self.error_consumable_missing_message,
+            self.error_consumable_excess_message,
+        )
+
+        if len(tools) != len(self.tool_tags):
+            raise CraftingValidationError(
+                f"Tools {tools}'s tags do not match expected tags {self.tool_tags}"
+            )
+        if len(consumables) != len(self.consumable_tags):
+            raise CraftingValidationError(
+                f"Consumables {consumables}'s tags do not match "
+                f"expected tags {self.consumable_tags}"
+            )
+
+        self.validated_tools = tools
+        self.validated_consumables = consumables
+
+    def post_craft(self, craft_result, **kwargs):
+        """
+        Use up the consumables, only taking as many items from a stack as were needed.
+        """
+        # take over consuming the inputs from the base recipe
+        consumables, self.validated_consumables = self.validated_consumables, []
+        craft_result = super().post_craft(craft_result, **kwargs)
+
+        if craft_result or self.consume_on_fail:
+            for obj, amount in Counter(consumables).items():
+                if isinstance(obj, StackableObject):
+                    obj.consume(amount)
+                else:
+                    obj.delete()
+
+        return craft_result
+
+    def do_craft(self, **kwargs):
+        """
+        Spawn the output prototypes directly into the crafter's inventory.
+        """
+        # a batched craft makes everything several times over
+        count = kwargs.get("count", 1)
+        requests = [
+            (compiled, amount * count, self.crafter)
+            for compiled, amount in self.compiled_outputs
+        ]
+        return bulk_spawn(*requests).objects
@@ -0,0 +1,88 @@
+"""
+Recipe index
+
+Indexes every recipe in `CRAFT_RECIPE_MODULES` by the tool and material tags it needs,
+so a crafter's whole inventory can be checked against all of the recipes at once.
+"""
+
+from collections import Counter, defaultdict
+from evennia.contrib.game_systems.crafting import crafting, CraftingRecipe
+
+from typeclasses.objects import StackableObject
+
+_TOOL_CATEGORY = CraftingRecipe.tool_tag_category
+_MATERIAL_CATEGORY = CraftingRecipe.consumable_tag_category
+
+
+class RecipeIndex:
+    """
+    Maps each recipe to the counts of tool and material tags it needs, and each tag to
+    the recipes which need it.
+    """
+
+    def __init__(self):
+        # recipe name to (recipe class, tool tag counts, material tag counts)
+        self.requirements = {}
+        # tag to the names of the recipes which need it
+        self.by_tag = defaultdict(set)
+
+    def build(self):
+        """
+        (Re)build the index from all of the loaded recipe classes.
+        """
+        crafting._load_recipes()
+        self.requirements.clear()
+        self.by_tag.clear()
+        for name, recipe in crafting._RECIPE_CLASSES.items():
+            tools = Counter(recipe.tool_tags)
+            materials = Counter(recipe.consumable_tags)
+            self.requirements[name] = (recipe, tools, materials)
+            for tag in tools.keys() | materials.keys():
+                self.by_tag[tag].add(name)
+
+    def craftable(self, crafter):
+        """
+        Find every recipe the crafter has the tools, materials and skill for right now.
+
+        Materials must be carried, while tools can also be in the crafter's location. An
+        object with several tags counts towards each of them, so this is a quick guide -
+        crafting still validates the actual inputs.
+
+        Returns:
+            names (list): the names of the craftable recipes, in alphabetical order
+        """
+        if not self.requirements:
+            self.build()
+
+        tools = Counter()
+        materials = Counter()
+        nearby = crafter.location.contents if crafter.location else []
+        # count up the tags on everything we have to work with, in a single pass
+        for obj in crafter.contents + nearby:
+            for tag in obj.tags.get(category=_TOOL_CATEGORY, return_list=True):
+                tools[tag] += 1
+            if obj.location == crafter:
+                amount = obj.quantity if isinstance(obj, StackableObject) else 1
+                for tag in obj.tags.get(category=_MATERIAL_CATEGORY, return_list=True):
+                    materials[tag] += amount
+
+        candidates = set()
+        for tag in tools.keys() | materials.keys():
+            candidates |= self.by_tag.get(tag, set())
+
+        names = []
+        for name in candidates:
+            recipe, needed_tools, needed_materials = self.requirements[name]
+            if not (needed_tools <= tools and needed_materials <= materials):
+                continue
+            skill, difficulty = getattr(recipe, "skill", (None, 0))
+            if skill and difficulty:
+                known = crafter.get_skill(skill)
+                if not known or known.value < difficulty:
+                    continue
+            names.append(name)
+        return sorted(names)
+
+
+# the shared index, built the first time it's needed or on server start
+RECIPE_INDEX = RecipeIndex()
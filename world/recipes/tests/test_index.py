@@ -0,0 +1,48 @@
+"""
+Tests for the recipe index
+
+"""
+
+from evennia.utils import create
+from evennia.utils.test_resources import EvenniaTest
+from world.recipes.index import RecipeIndex
+
+
+class TestRecipeIndex(EvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.crafter = self.char2
+        self.crafter.traits.add(
+            "smithing", "Smithing", trait_type="counter", min=0, max=100
+        )
+        self.crafter.traits.smithing.base = 1
+        self.index = RecipeIndex()
+        self.index.build()
+        # the furnace is in the room, not carried
+        create.object(
+            key="furnace",
+            location=self.room1,
+            tags=[("furnace", "crafting_tool")],
+        )
+
+    def test_craftable(self):
+        self.assertNotIn("iron ingot", self.index.craftable(self.crafter))
+        create.object(
+            "typeclasses.objects.StackableObject",
+            key="iron ore",
+            location=self.crafter,
+            attributes=[("quantity", 2)],
+            tags=[("iron ore", "crafting_material")],
+        )
+        self.assertIn("iron ingot", self.index.craftable(self.crafter))
+
+    def test_skill(self):
+        create.object(
+            "typeclasses.objects.StackableObject",
+            key="iron ore",
+            location=self.crafter,
+            attributes=[("quantity", 2)],
+            tags=[("iron ore", "crafting_material")],
+        )
+        self.crafter.traits.smithing.base = 0
+        self.assertNotIn("iron ingot", self.index.craftable(self.crafter))
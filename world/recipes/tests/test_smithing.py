@@ -3,6 +3,8 @@ Tests for smithing recipes
 
 """
 
+from unittest.mock import patch
+from evennia.utils import create
 from evennia.utils.test_resources import EvenniaTest
 from evennia.contrib.game_systems.crafting import crafting
 from world.recipes import smithing
@@ -21,3 +23,97 @@ class TestSmithingRecipes(EvenniaTest):
         tools, ingredients = smithing.SmeltIronRecipe.seed()
         results = crafting.craft(self.crafter, "iron ingot", *tools, *ingredients)
         self.assertEqual(results[0].key, "iron ingot")
+
+    @patch("world.recipes.base.randint", return_value=1)
+    def test_ingot_from_stack(self, _):
+        tools, _ = smithing.SmeltIronRecipe.seed()
+        ore = create.object(
+            "typeclasses.objects.StackableObject",
+            key="iron ore",
+            location=self.crafter,
+            attributes=[("quantity", 3)],
+            tags=[("iron ore", "crafting_material")],
+        )
+        results = crafting.craft(self.crafter, "iron ingot", *tools, ore)
+        self.assertEqual(results[0].key, "iron ingot")
+        self.assertEqual(ore.quantity, 1)
+
+    @patch("world.recipes.base.randint", side_effect=[1, 0, 1])
+    def test_ingot_batch(self, _):
+        tools, _ = smithing.SmeltIronRecipe.seed()
+        ore = create.object(
+            "typeclasses.objects.StackableObject",
+            key="iron ore",
+            location=self.crafter,
+            attributes=[("quantity", 7)],
+            tags=[("iron ore", "crafting_material")],
+        )
+        self.crafter.db.exp = 0
+        focus = self.crafter.traits.fp.current
+        results = crafting.craft(self.crafter, "iron ingot", *tools, ore, count=3)
+        # the failed attempt keeps its ore but still costs focus and gives exp
+        self.assertEqual([obj.key for obj in results], ["iron ingot"] * 2)
+        self.assertEqual(ore.quantity, 3)
+        self.assertEqual(self.crafter.db.exp, 3)
+        self.assertEqual(self.crafter.traits.fp.current, focus - 15)
+
+    @patch("world.recipes.base.randint", return_value=1)
+    def test_craft_command_batch(self, _):
+        tools, _ = smithing.SmeltIronRecipe.seed(tool_kwargs={"location": self.crafter})
+        create.object(
+            "typeclasses.objects.StackableObject",
+            key="iron ore",
+            location=self.crafter,
+            attributes=[("quantity", 4)],
+            tags=[("iron ore", "crafting_material")],
+        )
+        self.crafter.execute_cmd(
+            f"craft 2 iron ingot from iron ore using {tools[0].key}"
+        )
+        ingots = [obj for obj in self.crafter.contents if obj.key == "iron ingot"]
+        self.assertEqual(sum(obj.attributes.get("quantity", 1) for obj in ingots), 2)
+
+    def test_ingot_batch_not_enough(self):
+        tools, _ = smithing.SmeltIronRecipe.seed()
+        ore = create.object(
+            "typeclasses.objects.StackableObject",
+            key="iron ore",
+            location=self.crafter,
+            attributes=[("quantity", 3)],
+            tags=[("iron ore", "crafting_material")],
+        )
+        focus = self.crafter.traits.fp.current
+        self.assertFalse(
+            crafting.craft(self.crafter, "iron ingot", *tools, ore, count=2)
+        )
+        self.assertEqual(ore.quantity, 3)
+        self.assertEqual(self.crafter.traits.fp.current, focus)
+
+    @patch("world.recipes.base.randint", return_value=0)
+    def test_ingot_batch_all_fail(self, _):
+        tools, _ = smithing.SmeltIronRecipe.seed()
+        ore = create.object(
+            "typeclasses.objects.StackableObject",
+            key="iron ore",
+            location=self.crafter,
+            attributes=[("quantity", 4)],
+            tags=[("iron ore", "crafting_material")],
+        )
+        with patch.object(self.crafter, "msg") as mock_msg:
+            self.assertFalse(
+                crafting.craft(self.crafter, "iron ingot", *tools, ore, count=2)
+            )
+        mock_msg.assert_called_once()
+        self.assertEqual(
+            mock_msg.call_args.kwargs["text"][0],
+            "It doesn't seem to work out. Maybe you should try again?",
+        )
+        self.assertEqual(ore.quantity, 4)
+
+    def test_ingot_batch_too_many(self):
+        tools, ingredients = smithing.SmeltIronRecipe.seed()
+        self.assertFalse(
+            crafting.craft(
+                self.crafter, "iron ingot", *tools, *ingredients, count=10**9
+            )
+        )
@@ -0,0 +1,197 @@
+"""
+Bulk spawning
+
+Helpers for spawning many prototyped objects at once, e.g. gathered materials, loot
+drops and shop restocks.
+"""
+
+from collections import namedtuple
+from time import perf_counter
+from django.conf import settings
+from django.db import transaction
+from evennia.prototypes import prototypes as protlib
+from evennia.prototypes.spawner import spawn, batch_create_object
+from evennia.utils import class_from_module, delay, inherits_from
+
+_STACK_TYPECLASS = "typeclasses.objects.StackableObject"
+
+# the result of a bulk spawn: the new objects, how many there were, and how many seconds it took
+SpawnReport = namedtuple("SpawnReport", ("objects", "count", "elapsed"))
+
+
+def _has_protfuncs(value):
+    """
+    Whether a prototype, or any value in it, uses protfuncs - and so can come out
+    differently every time it's spawned.
+    """
+    if isinstance(value, str):
+        return "$" in value
+    if isinstance(value, dict):
+        return any(_has_protfuncs(val) for val in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_protfuncs(val) for val in value)
+    return False
+
+
+def _with_quantity(objparams, quantity):
+    """
+    Set how many items a stackable object's creation parameters will make a stack of.
+    """
+    create_kwargs, perms, locks, aliases, nattributes, attributes, tags, execs = (
+        objparams
+    )
+    attributes = [attr for attr in attributes if attr[0] != "quantity"]
+    attributes.append(("quantity", quantity, None, None))
+    return (create_kwargs, perms, locks, aliases, nattributes, attributes, tags, execs)
+
+
+def _stack_params(params):
+    """
+    Collapse the creation parameters for individually-spawned stackable items into one
+    stack for each distinct item, e.g. one stack per flavor of pie.
+    """
+    stacks = {}
+    for objparams in params:
+        key = objparams[0].get("db_key")
+        if key in stacks:
+            stacks[key][1] += 1
+        else:
+            stacks[key] = [objparams, 1]
+    return [_with_quantity(objparams, count) for objparams, count in stacks.values()]
+
+
+class CompiledPrototype:
+    """
+    A prototype that's only homogenized and validated once, so that it can be spawned
+    over and over without walking through the whole prototype every time.
+
+    The creation parameters are worked out the first time it's spawned. Prototypes which
+    use protfuncs are still validated for every object, so that each one comes out
+    differently as it should.
+    """
+
+    __slots__ = ("prototype", "stackable", "dynamic", "_params")
+
+    def __init__(self, prototype):
+        if isinstance(prototype, dict):
+            prototype = protlib.homogenize_prototype(prototype)
+        self.prototype = prototype
+        self.stackable = False
+        self.dynamic = False
+        self._params = None
+
+    @property
+    def params(self):
+        """The spawner's creation parameters for one object, built on first use."""
+        if self._params is None:
+            prototype = self.prototype
+            if isinstance(prototype, str):
+                prototype = protlib.search_prototype(prototype, require_single=True)[0]
+                prototype = self.prototype = protlib.homogenize_prototype(prototype)
+            typeclass = class_from_module(
+                prototype.get("typeclass", settings.BASE_OBJECT_TYPECLASS)
+            )
+            self.stackable = inherits_from(typeclass, _STACK_TYPECLASS)
+            self.dynamic = _has_protfuncs(prototype)
+            self._params = spawn(prototype, only_validate=True)[0]
+        return self._params
+
+    def build(self, count):
+        """
+        Get the creation parameters for `count` new objects.
+
+        Returns:
+            list: A fresh set of parameters for each object to create, ready for
+                `batch_create_object`.
+        """
+        create_kwargs, perms, locks, aliases, nattributes, attributes, tags, execs = (
+            self.params
+        )
+        if self.dynamic:
+            params = spawn(*[self.prototype] * count, only_validate=True)
+            return _stack_params(params) if self.stackable else params
+        if self.stackable:
+            # one object can hold the whole lot
+            attributes = [attr for attr in attributes if attr[0] != "quantity"]
+            attributes.append(("quantity", count, None, None))
+            count = 1
+        return [
+            (
+                dict(create_kwargs),
+                perms,
+                locks,
+                aliases,
+                dict(nattributes),
+                attributes,
+                tags,
+                execs,
+            )
+            for _ in range(count)
+        ]
+
+
+def bulk_spawn(*requests, move_hooks=False):
+    """
+    Spawn any number of objects from prototypes, resolving each prototype only once and
+    creating all of the objects in a single database transaction.
+
+    Stackable prototypes are spawned as a single stack holding all of the requested items,
+    which then merges into any matching stack at its destination. If the prototype uses
+    protfuncs, there's a stack for each distinct item instead.
+
+    Args:
+        *requests (tuple): Each request is a tuple of `(prototype, count, destination)`,
+            where `prototype` is a prototype key, dict or `CompiledPrototype` and
+            `destination` is where to put the new objects (or None to use the prototype's
+            own location).
+
+    Keyword Args:
+        move_hooks (bool): If True, the new objects are moved into their destination
+            with `move_to`, firing all the usual move hooks. Otherwise, they're created
+            directly inside their destination.
+
+    Returns:
+        report (SpawnReport): The new objects, how many were made, and how long it took.
+    """
+    start = perf_counter()
+    objparams = []
+    destinations = []
+    for prototype, count, destination in requests:
+        if count < 1:
+            continue
+        if isinstance(prototype, CompiledPrototype):
+            params = prototype.build(count)
+        else:
+            # look up and clean up the prototype just once for the whole batch
+            if isinstance(prototype, str):
+                prototype = protlib.search_prototype(prototype, require_single=True)[0]
+            prototype = protlib.homogenize_prototype(prototype)
+            typeclass = class_from_module(
+                prototype.get("typeclass", settings.BASE_OBJECT_TYPECLASS)
+            )
+            if not inherits_from(typeclass, _STACK_TYPECLASS):
+                params = spawn(*[prototype] * count, only_validate=True)
+            elif _has_protfuncs(prototype):
+                # each item can come out differently, so stack up the ones that match
+                params = _stack_params(spawn(*[prototype] * count, only_validate=True))
+            else:
+                # one object can hold the whole lot
+                params = spawn(dict(prototype, quantity=count), only_validate=True)
+        if destination and not move_hooks:
+            # create the objects in their destination directly
+            for create_kwargs, *_ in params:
+                create_kwargs["db_location"] = destination
+        objparams.extend(params)
+        destinations.extend([destination] * len(params))
+
+    with transaction.atomic():
+        objs = batch_create_object(*objparams)
+
+    for obj, destination in zip(objs, destinations):
+        if move_hooks and destination:
+            obj.move_to(destination, quiet=True, move_type="spawn")
+        elif inherits_from(obj, _STACK_TYPECLASS):
+            # new stacks merge with the existing ones once the caller is done with them
+            delay(0, obj.restack)
+
+    return SpawnReport(objs, len(objs), perf_counter() - start)
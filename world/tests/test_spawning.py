@@ -0,0 +1,42 @@
+"""
+Tests for bulk spawning
+
+"""
+
+from evennia.utils.test_resources import EvenniaTest
+from world.spawning import CompiledPrototype, bulk_spawn
+
+
+class TestBulkSpawn(EvenniaTest):
+    def test_bulk_spawn(self):
+        report = bulk_spawn(
+            ("IRON_SWORD", 3, self.char1), ("COPPER_ORE", 2, self.room1)
+        )
+        self.assertEqual(report.count, 4)
+        self.assertEqual(
+            [obj.key for obj in self.char1.contents].count("iron sword"), 3
+        )
+        self.assertTrue(
+            report.objects[0].tags.has("iron_sword", category="from_prototype")
+        )
+        # stackable prototypes are spawned as a single stack
+        stack = report.objects[-1]
+        self.assertEqual(stack.location, self.room1)
+        self.assertEqual(stack.quantity, 2)
+
+    def test_bulk_spawn_dict(self):
+        prototype = {"key": "pebble", "value": 1}
+        report = bulk_spawn((prototype, 2, self.room1), (prototype, 0, self.room1))
+        self.assertEqual(report.count, 2)
+        self.assertEqual(report.objects[1].location, self.room1)
+        self.assertEqual(report.objects[1].db.value, 1)
+
+    def test_bulk_spawn_protfuncs(self):
+        compiled = CompiledPrototype("PIE_SLICE")
+        for prototype in ("PIE_SLICE", compiled):
+            report = bulk_spawn((prototype, 20, self.room1))
+            # every slice still gets its own flavor, stacked up by flavor
+            keys = [obj.key for obj in report.objects]
+            self.assertEqual(len(keys), len(set(keys)))
+            self.assertGreater(len(keys), 1)
+            self.assertEqual(sum(obj.quantity for obj in report.objects), 20)